@@ -1,23 +1,165 @@
 from flask import Flask, jsonify, request
 from flask_cors import CORS
-import pandas as pd
 import numpy as np
 import os
+import tempfile
+import threading
 
-# importar modulos propios
-from models.procesador_datos import ProcesadorDatos
-from models.entrenador import EntrenadorModelo
-from models.evaluador import EvaluadorModelo
-from models.clasificador_estudiante import ClasificadorEstudiante
+# importar modulos propios: solo los necesarios para servir predicciones.
+# pandas y los modulos de limpieza, entrenamiento y busqueda se importan al
+# primer uso, asi un proceso que solo predice arranca sin cargarlos
+from models.servicio import ModeloServicio
+from models.trabajos import GestorTrabajos
+from models.registro import RegistroModelos, DIRECTORIO_REGISTRO, ARCHIVO_MODELO
 
 app = Flask(__name__)
 # permitir llamadas desde el frontend durante el desarrollo
 CORS(app)
 
-# variables globales
+# variables globales (procesador y entrenador se crean al primer uso)
 datos = None
-procesador = ProcesadorDatos()
-entrenador = EntrenadorModelo()
+procesador = None
+entrenador = None
+
+# modelo que atienden los endpoints de prediccion: instantanea inmutable que solo
+# se reemplaza completa (cambio de referencia) cuando termina un entrenamiento
+modelo_servicio = None
+candado_modelo = threading.Lock()
+
+DIRECTORIO_DATOS = os.path.join(os.path.dirname(__file__), 'data')
+
+# versiones guardadas del modelo (data/registro) y la promovida
+registro_modelos = RegistroModelos(os.path.join(DIRECTORIO_DATOS, DIRECTORIO_REGISTRO))
+
+# pool de trabajos de entrenamiento en segundo plano
+gestor_trabajos = GestorTrabajos(max_trabajadores=int(os.environ.get('STUDENTGUARD_TRAIN_JOBS', '1')))
+
+# columnas que espera el modelo, en el orden de entrenamiento
+COLUMNAS_PREDICCION = [
+    'promedio_actual', 'asistencia_clases', 'tareas_entregadas',
+    'participacion_clase', 'horas_estudio', 'promedio_evaluaciones',
+    'cursos_reprobados', 'actividades_extracurriculares', 'reportes_disciplinarios'
+]
+
+# datos limpios en formato binario (matriz .npy + etiquetas + esquema json)
+RUTA_DATOS_BINARIOS = os.path.join(os.path.dirname(__file__), 'data', 'datos_limpios')
+
+# buffer en disco para la matriz de entrenamiento (opcion buffer_en_disco): uno por
+# trabajo, para no truncar el que sigue mapeado por el entrenador publicado
+PLANTILLA_BUFFER_ENTRENAMIENTO = os.path.join(os.path.dirname(__file__), 'data', 'buffer_entrenamiento_{}.dat')
+
+# trabajadores para la validacion cruzada paralela (0 = uno por nucleo)
+CV_TRABAJADORES = int(os.environ.get('STUDENTGUARD_CV_JOBS', '0')) or None
+CV_BACKEND = os.environ.get('STUDENTGUARD_CV_BACKEND', 'thread')
+
+# las configuraciones de /modelo/busqueda se evaluan en procesos por defecto
+BUSQUEDA_BACKEND = os.environ.get('STUDENTGUARD_BUSQUEDA_BACKEND', 'process')
+
+# opciones del optimizador que se aceptan en /modelo/entrenar
+OPCIONES_ENTRENAMIENTO = [
+    'solver', 'batch_size', 'momentum', 'tol', 'n_iter_no_change',
+    'early_stopping', 'validation_fraction', 'warm_start'
+]
+
+
+def obtener_procesador():
+    """procesador de datos; importa pandas y la limpieza solo al primer uso"""
+    global procesador
+    if procesador is None:
+        from models.procesador_datos import ProcesadorDatos
+        procesador = ProcesadorDatos()
+    return procesador
+
+
+def obtener_entrenador():
+    """
+    entrenador del modelo publicado; si solo se cargo la instantanea de servicio
+    (inicio o promocion) se crea al primer uso desde el artefacto guardado
+    """
+    global entrenador
+    from models.entrenador import EntrenadorModelo
+    
+    while True:
+        actual = entrenador
+        if actual is not None:
+            return actual
+            
+        # la carga desde disco se hace fuera del candado: no frena las publicaciones
+        servicio = modelo_servicio
+        nuevo_entrenador = EntrenadorModelo()
+        if servicio is not None:
+            nuevo_entrenador.cargar_modelo(DIRECTORIO_DATOS)
+            
+        with candado_modelo:
+            # se descarta si otro hilo ya lo cargo o si se publico otro modelo entretanto
+            if entrenador is None and modelo_servicio is servicio:
+                entrenador = nuevo_entrenador
+            if entrenador is not None:
+                return entrenador
+
+
+def publicar_modelo(nuevo_entrenador, servicio=None):
+    """
+    reemplaza el entrenador y el modelo de servicio de una sola vez
+    la instantanea se construye antes de tomar el candado; las predicciones en curso
+    siguen usando la referencia anterior y nunca ven un modelo a medio actualizar
+    nuevo_entrenador=None publica solo la instantanea (el entrenador se carga al usarlo)
+    """
+    global entrenador, modelo_servicio
+    
+    if servicio is None:
+        servicio = nuevo_entrenador.instantanea()
+    with candado_modelo:
+        entrenador = nuevo_entrenador
+        modelo_servicio = servicio
+
+
+def cargar_modelo_inicial():
+    """
+    carga el modelo guardado al iniciar la aplicacion (si existe); solo se lee el
+    artefacto, sin importar los modulos de entrenamiento ni escribir en disco
+    (los pickles anteriores se migran en la primera peticion)
+    """
+    ruta_modelo = os.path.join(DIRECTORIO_DATOS, ARCHIVO_MODELO)
+    if not os.path.exists(ruta_modelo):
+        return
+    try:
+        # sin mmap: /modelo/versiones/<v>/promover reemplaza este archivo
+        publicar_modelo(None, ModeloServicio.desde_archivo(ruta_modelo, mmap=False))
+    except (ValueError, OSError) as e:
+        print(f'sin modelo guardado al iniciar: {e}')
+
+
+# los pickles anteriores se migran una vez por proceso, en la primera peticion
+migracion_pendiente = True
+candado_migracion = threading.Lock()
+
+
+@app.before_request
+def migrar_modelo_anterior():
+    """
+    formato anterior (pickle): la migracion necesita el entrenador completo y
+    escribe el artefacto y el registro, por eso no se hace al importar la app;
+    EntrenadorModelo.cargar_modelo la protege con un candado entre procesos y
+    el resto de los workers solo lee el artefacto ya migrado
+    """
+    global migracion_pendiente
+    if not migracion_pendiente:
+        return
+    with candado_migracion:
+        if not migracion_pendiente:
+            return
+        try:
+            if (modelo_servicio is None and
+                    os.path.exists(os.path.join(DIRECTORIO_DATOS, 'modelo_studentguard.pkl'))):
+                from models.entrenador import EntrenadorModelo
+                cargado = EntrenadorModelo()
+                cargado.cargar_modelo(DIRECTORIO_DATOS)
+                publicar_modelo(cargado)
+        except (ValueError, OSError) as e:
+            print(f'no se pudo migrar el modelo anterior: {e}')
+        finally:
+            migracion_pendiente = False
 
 
 @app.route('/')
@@ -36,9 +178,23 @@ def upload_csv():
     if file.filename == '':
         return jsonify({'error': 'archivo vacio'}), 400
 
+    import pandas as pd
+    from models.procesador_datos import VALORES_NULOS
+    procesador = obtener_procesador()
     try:
-        
-        datos = pd.read_csv(file)
+        # modo streaming: lectura por bloques solo con las columnas del modelo
+        if request.values.get('streaming', '').lower() in ('1', 'true', 'si'):
+            tamano_bloque = int(request.values.get('tamano_bloque', 50000))
+            datos = procesador.cargar_csv_por_bloques(file.stream, tamano_bloque=tamano_bloque)
+            return jsonify({
+                'message': 'Archivo recibido',
+                'filas': int(len(datos)),
+                'progreso': procesador.registros
+            }), 200
+            
+        # los textos nulos se reconocen al parsear, asi las columnas numericas
+        # llegan ya como numeros a la limpieza
+        datos = pd.read_csv(file, na_values=VALORES_NULOS)
         return jsonify({'message': 'Archivo recibido'}), 200
     except Exception as e:
         return jsonify({'error': f'Error al leer CSV: {str(e)}'}), 500
@@ -48,20 +204,28 @@ def limpieza_de_datos():
     """
     ejecuta limpieza de datos usando el modulo data_processor
     """
-    global datos, procesador
+    global datos
 
     if datos is None:
         return jsonify({'error': 'no hay datos cargados en el servidor'}), 404
 
+    procesador = obtener_procesador()
     try:
+        # opciones de limpieza (actividades como conteo o como indicadores)
+        datos_request = request.get_json(silent=True) or {}
+        modo_actividades = datos_request.get('modo_actividades', 'conteo')
+        
         # usar el procesador para limpiar datos
         procesador.cargar_datos(datos)
-        datos_limpios = procesador.limpiar_datos()
+        datos_limpios = procesador.limpiar_datos(modo_actividades=modo_actividades)
         
         # guardar datos limpios
         outdir = os.path.join(os.path.dirname(__file__), 'data')
         outpath = os.path.join(outdir, 'datos_limpios.csv')
         procesador.guardar_datos_limpios(outpath)
+        procesador.guardar_datos_binarios(RUTA_DATOS_BINARIOS)
+        # estadisticas congeladas, indice de filas y datos crudos para /datos/anexar
+        procesador.guardar_estado_incremental(DIRECTORIO_DATOS)
         
         # obtener estadisticas
         estadisticas = procesador.obtener_estadisticas()
@@ -77,63 +241,417 @@ def limpieza_de_datos():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/datos/limpieza-por-bloques', methods=['POST'])
+def limpieza_por_bloques():
+    """
+    limpieza fuera de memoria: recibe un csv, lo limpia en dos pasadas por bloques
+    y escribe datos_limpios.csv y los datos binarios sin cargar nunca el archivo
+    completo; el entrenamiento mapea despues los datos binarios
+    """
+    if 'file' not in request.files:
+        return jsonify({'error': 'No se recibio ningun archivo '}), 400
+
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({'error': 'archivo vacio'}), 400
+
+    from models.procesador_datos import ARCHIVO_ESTADISTICAS
+    procesador = obtener_procesador()
+    ruta_temporal = None
+    try:
+        tamano_bloque = int(request.values.get('tamano_bloque', 50000))
+        
+        # el archivo se guarda en disco para poder recorrerlo dos veces
+        with tempfile.NamedTemporaryFile(suffix='.csv', delete=False) as temporal:
+            ruta_temporal = temporal.name
+        file.save(ruta_temporal)
+        
+        outdir = os.path.join(os.path.dirname(__file__), 'data')
+        outpath = os.path.join(outdir, 'datos_limpios.csv')
+        resumen = procesador.limpiar_csv_por_bloques(ruta_temporal, outpath, tamano_bloque=tamano_bloque,
+                                                     ruta_binarios=RUTA_DATOS_BINARIOS)
+        
+        # esta limpieza no guarda estado incremental: el anterior ya no corresponde
+        ruta_estadisticas = os.path.join(DIRECTORIO_DATOS, ARCHIVO_ESTADISTICAS)
+        if os.path.exists(ruta_estadisticas):
+            os.remove(ruta_estadisticas)
+        
+        # el resultado no se carga en memoria: sin datos_limpios el entrenamiento
+        # mapea los datos binarios escritos en la pasada 2
+        procesador.datos_limpios = None
+        
+        return jsonify({
+            'message': 'limpieza por bloques completada exitosamente',
+            'logs': procesador.registros,
+            'resumen': resumen,
+            'estadisticas': {
+                'filas': resumen['filas_escritas'],
+                'columnas': resumen['columnas'],
+                'valores_nulos': 0,
+                'distribucion_riesgo': resumen['distribucion_riesgo_limpia']
+            },
+            'clean_path': outpath
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        if ruta_temporal and os.path.exists(ruta_temporal):
+            os.remove(ruta_temporal)
+
+
+@app.route('/datos/anexar', methods=['POST'])
+def anexar_datos():
+    """
+    ingesta incremental: recibe un lote nuevo (csv) y limpia solo esas filas con
+    las estadisticas congeladas de la ultima limpieza completa; las filas nuevas
+    se agregan al final de datos_limpios.csv. si el lote se desvia demasiado
+    (drift > umbral_drift) se rehace la limpieza completa
+    """
+    global datos
+    
+    import pandas as pd
+    from models.procesador_datos import VALORES_NULOS, UMBRAL_DRIFT, ARCHIVO_ESTADISTICAS
+    if 'file' not in request.files:
+        return jsonify({'error': 'No se recibio ningun archivo '}), 400
+    if not os.path.exists(os.path.join(DIRECTORIO_DATOS, ARCHIVO_ESTADISTICAS)):
+        return jsonify({'error': 'no hay estadisticas de limpieza, ejecuta /datos/limpieza primero'}), 404
+        
+    try:
+        umbral_drift = float(request.values.get('umbral_drift', UMBRAL_DRIFT))
+        forzar_refresco = request.values.get('forzar_refresco', '').lower() in ('1', 'true', 'si')
+        nuevos = pd.read_csv(request.files['file'], na_values=VALORES_NULOS)
+        
+        procesador = obtener_procesador()
+        outpath = os.path.join(DIRECTORIO_DATOS, 'datos_limpios.csv')
+        # al almacen binario solo se agregan las filas nuevas (salvo refresco)
+        informe = procesador.anexar_datos(
+            nuevos, DIRECTORIO_DATOS, outpath,
+            umbral_drift=umbral_drift, forzar_refresco=forzar_refresco,
+            ruta_binarios=RUTA_DATOS_BINARIOS
+        )
+        
+        # los datos crudos en memoria tambien incluyen el lote
+        if datos is not None:
+            datos = pd.concat([datos, nuevos], ignore_index=True)
+        
+        return jsonify({
+            'message': 'lote anexado exitosamente',
+            'logs': procesador.registros,
+            'informe': informe,
+            'estadisticas': procesador.obtener_estadisticas(),
+            'clean_path': outpath
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+def preparar_entrenador(trabajo, datos_request, datos_limpios, estadisticas_limpieza=None):
+    """
+    entrenador nuevo con los datos preparados (division, estandarizacion)
+    estadisticas_limpieza: las de la limpieza de datos_limpios, se guardan con el
+    modelo (los datos binarios ya las incluyen en su esquema)
+    """
+    from models.entrenador import EntrenadorModelo
+    
+    # se entrena sobre un entrenador propio; el que atiende peticiones no se toca
+    nuevo_entrenador = EntrenadorModelo()
+    
+    trabajo.iniciar_fase('preparacion', 'preparando datos para entrenamiento...')
+    # matriz de entrenamiento: float64 (defecto) o float32, en ram o mapeada en disco
+    opciones_datos = {
+        'dtype': np.float32 if datos_request.get('dtype_datos') == 'float32' else np.float64,
+        'ruta_buffer': PLANTILLA_BUFFER_ENTRENAMIENTO.format(trabajo.id) if datos_request.get('buffer_en_disco') else None
+    }
+    if datos_limpios is None:
+        info_preparacion = nuevo_entrenador.preparar_datos_binarios(RUTA_DATOS_BINARIOS, **opciones_datos)
+    else:
+        info_preparacion = nuevo_entrenador.preparar_datos(
+            datos_limpios, estadisticas_limpieza=estadisticas_limpieza, **opciones_datos
+        )
+    trabajo.registrar(f"datos preparados: {info_preparacion['train_samples']} entrenamiento, {info_preparacion['test_samples']} prueba")
+    
+    return nuevo_entrenador, info_preparacion
+
+
+def ejecutar_entrenamiento(trabajo, datos_request, datos_limpios, preparado=None, estadisticas_limpieza=None):
+    """
+    pipeline completo de entrenamiento (preparar, entrenar, evaluar, guardar, publicar)
+    se ejecuta en el pool de trabajos; el progreso queda en 'trabajo'
+    preparado: (entrenador, info_preparacion) ya listos, para no repetir la preparacion
+    """
+    learning_rate = datos_request.get('learning_rate', 0.01)
+    max_iterations = datos_request.get('max_iterations', 1000)
+    regularization = datos_request.get('regularization', 0.01)
+    opciones = {k: datos_request[k] for k in OPCIONES_ENTRENAMIENTO if k in datos_request}
+    
+    trabajo.registrar('iniciando entrenamiento del modelo studentguard...')
+    trabajo.registrar(f'hiperparametros: learning_rate={learning_rate}, max_iterations={max_iterations}, regularization={regularization}')
+    if opciones:
+        trabajo.registrar(f'opciones del optimizador: {opciones}')
+    
+    # preparar datos para entrenamiento
+    if preparado is None:
+        preparado = preparar_entrenador(trabajo, datos_request, datos_limpios, estadisticas_limpieza)
+    nuevo_entrenador, info_preparacion = preparado
+    
+    # entrenar modelo con parametros personalizados; cada iteracion reporta su costo
+    trabajo.iniciar_fase('entrenamiento', 'entrenando modelo studentguard (implementacion propia)...')
+    # warm_start parte del modelo que se esta sirviendo (si existe)
+    inicial = modelo_servicio if opciones.get('warm_start') else None
+    if inicial is not None:
+        trabajo.registrar(f'warm start desde el modelo {inicial.huella[:12]}')
+    info_modelo = nuevo_entrenador.entrenar(
+        learning_rate=learning_rate,
+        max_iterations=max_iterations,
+        regularization=regularization,
+        callback=trabajo.registrar_costo,
+        inicial=inicial,
+        **opciones
+    )
+    trabajo.registrar(f"entrenamiento completado en {info_modelo['iteraciones_ejecutadas']} iteraciones!")
+    
+    # evaluar modelo
+    trabajo.iniciar_fase('evaluacion', 'evaluando rendimiento del modelo...')
+    evaluacion = nuevo_entrenador.evaluar(n_jobs=CV_TRABAJADORES, backend=CV_BACKEND,
+                                          cv_warm_start=bool(datos_request.get('cv_warm_start')))
+    trabajo.registrar('evaluacion completada!')
+    
+    # guardar modelo como nueva version del registro
+    trabajo.iniciar_fase('guardado', 'guardando modelo entrenado...')
+    promover = bool(datos_request.get('promover', True))
+    rutas = nuevo_entrenador.guardar_modelo(DIRECTORIO_DATOS, registro=registro_modelos, promover=promover)
+    trabajo.registrar(f"modelo guardado en {rutas['modelo_path']} (version {rutas['version']})")
+    
+    # publicar el modelo nuevo para las predicciones (cambio atomico de referencia)
+    if promover:
+        publicar_modelo(nuevo_entrenador)
+        trabajo.registrar('modelo publicado para predicciones')
+    
+    return {
+        'model_info': info_modelo,
+        'iteraciones_ejecutadas': info_modelo['iteraciones_ejecutadas'],
+        'preparacion_datos': info_preparacion,
+        'evaluacion': evaluacion,
+        'rutas': rutas
+    }
+
+
 @app.route('/modelo/entrenar', methods=['POST'])
 def entrenar_modelo():
     """
     entrena el modelo studentguard usando implementacion propia
     recibe hiperparametros dinamicos desde el frontend
+    el entrenamiento corre como trabajo en segundo plano: con "asincrono": true
+    responde 202 con el id del trabajo; si no, espera el resultado como antes
     """
-    global procesador, entrenador
+    # sin datos en memoria se usan los datos binarios guardados por la ultima limpieza
+    procesador = obtener_procesador()
+    datos_limpios = procesador.datos_limpios
+    estadisticas_limpieza = procesador.estadisticas_limpieza
+    if datos_limpios is None and not os.path.exists(f'{RUTA_DATOS_BINARIOS}.json'):
+        return jsonify({'error': 'no hay datos limpios, ejecuta limpieza primero'}), 404
+    
+    datos_request = (request.get_json(silent=True) if request.is_json else None) or {}
+    parametros = {k: v for k, v in datos_request.items() if k != 'asincrono'}
+    trabajo = gestor_trabajos.enviar(
+        lambda t: ejecutar_entrenamiento(t, parametros, datos_limpios, estadisticas_limpieza=estadisticas_limpieza),
+        parametros
+    )
+    
+    if datos_request.get('asincrono'):
+        return jsonify({
+            'message': 'entrenamiento en cola',
+            'trabajo_id': trabajo.id,
+            'estado': trabajo.estado,
+            'consulta': f'/modelo/trabajos/{trabajo.id}'
+        }), 202
     
-    if procesador.datos_limpios is None:
+    trabajo.esperar()
+    estado = trabajo.a_dict()
+    if estado['estado'] == 'error':
+        return jsonify({'error': estado['error'], 'logs': estado['logs'], 'trabajo_id': trabajo.id}), 500
+    
+    return jsonify({
+        'message': 'modelo entrenado exitosamente',
+        'logs': estado['logs'],
+        'trabajo_id': trabajo.id,
+        'tiempos_fases': estado['tiempos_fases'],
+        **estado['resultado']
+    }), 200
+
+
+def ejecutar_busqueda(trabajo, datos_request, datos_limpios, estadisticas_limpieza=None):
+    """
+    busqueda de hiperparametros sobre un unico conjunto preparado y estandarizado;
+    con 'entrenar_mejor' la mejor configuracion se entrena, evalua y guarda
+    """
+    from models.busqueda import generar_candidatos, busqueda_halving
+    
+    candidatos = generar_candidatos(
+        datos_request.get('espacio', {}),
+        modo=datos_request.get('modo', 'grid'),
+        n_candidatos=datos_request.get('n_candidatos', 10),
+        semilla=datos_request.get('semilla', 42)
+    )
+    trabajo.registrar(f'{len(candidatos)} configuraciones a evaluar')
+    
+    # los datos se preparan una sola vez para todas las configuraciones
+    preparado = preparar_entrenador(trabajo, datos_request, datos_limpios, estadisticas_limpieza)
+    nuevo_entrenador = preparado[0]
+    
+    trabajo.iniciar_fase('busqueda', 'evaluando configuraciones con validacion cruzada...')
+    resultado = busqueda_halving(
+        nuevo_entrenador.X_train, nuevo_entrenador.y_train, candidatos,
+        cv=int(datos_request.get('cv', 5)),
+        factor=datos_request.get('factor', 3),
+        min_muestras=datos_request.get('min_muestras'),
+        halving=bool(datos_request.get('halving', True)),
+        n_jobs=CV_TRABAJADORES,
+        backend=datos_request.get('backend', BUSQUEDA_BACKEND),
+        callback=lambda r: trabajo.registrar(
+            f"ronda {r['ronda']}: {r['candidatos']} configuraciones con {r['muestras']} filas, "
+            f"mejor score {r['resultados'][0]['score_medio']:.4f}"
+        )
+    )
+    trabajo.registrar(f"mejor configuracion: {resultado['mejor']['parametros']}")
+    
+    if datos_request.get('entrenar_mejor'):
+        parametros = {**resultado['mejor']['parametros'], 'promover': datos_request.get('promover', True)}
+        resultado['entrenamiento'] = ejecutar_entrenamiento(trabajo, parametros, datos_limpios, preparado)
+        
+    return resultado
+
+
+@app.route('/modelo/busqueda', methods=['POST'])
+def buscar_hiperparametros():
+    """
+    busqueda de hiperparametros (grid o aleatoria) con eliminacion sucesiva
+    corre en el pool de trabajos; con "asincrono": true responde 202 con el id
+    """
+    from models.busqueda import generar_candidatos
+    
+    procesador = obtener_procesador()
+    datos_limpios = procesador.datos_limpios
+    estadisticas_limpieza = procesador.estadisticas_limpieza
+    if datos_limpios is None and not os.path.exists(f'{RUTA_DATOS_BINARIOS}.json'):
         return jsonify({'error': 'no hay datos limpios, ejecuta limpieza primero'}), 404
+        
+    datos_request = request.get_json(silent=True) or {}
+    if not isinstance(datos_request.get('espacio'), dict) or not datos_request['espacio']:
+        return jsonify({'error': 'se requiere un espacio de busqueda (objeto json)'}), 400
     
+    # validar el espacio antes de encolar el trabajo
     try:
-        # obtener hiperparametros del request (con valores por defecto)
-        datos_request = request.get_json() if request.is_json else {}
-        learning_rate = datos_request.get('learning_rate', 0.01)
-        max_iterations = datos_request.get('max_iterations', 1000)
-        regularization = datos_request.get('regularization', 0.01)
-        
-        registros = ['iniciando entrenamiento del modelo studentguard...']
-        registros.append(f'hiperparametros: learning_rate={learning_rate}, max_iterations={max_iterations}, regularization={regularization}')
-        
-        # preparar datos para entrenamiento
-        registros.append('preparando datos para entrenamiento...')
-        info_preparacion = entrenador.preparar_datos(procesador.datos_limpios)
-        registros.append(f"datos preparados: {info_preparacion['train_samples']} entrenamiento, {info_preparacion['test_samples']} prueba")
-        
-        # entrenar modelo con parametros personalizados
-        registros.append('entrenando modelo studentguard (implementacion propia)...')
-        info_modelo = entrenador.entrenar(
-            learning_rate=learning_rate,
-            max_iterations=max_iterations,
-            regularization=regularization
-        )
-        registros.append('entrenamiento completado!')
+        generar_candidatos(datos_request['espacio'], modo=datos_request.get('modo', 'grid'),
+                           n_candidatos=datos_request.get('n_candidatos', 10))
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+    
+    parametros = {k: v for k, v in datos_request.items() if k != 'asincrono'}
+    trabajo = gestor_trabajos.enviar(
+        lambda t: ejecutar_busqueda(t, parametros, datos_limpios, estadisticas_limpieza),
+        parametros
+    )
+    
+    if datos_request.get('asincrono'):
+        return jsonify({
+            'message': 'busqueda en cola',
+            'trabajo_id': trabajo.id,
+            'estado': trabajo.estado,
+            'consulta': f'/modelo/trabajos/{trabajo.id}'
+        }), 202
+    
+    trabajo.esperar()
+    estado = trabajo.a_dict()
+    if estado['estado'] == 'error':
+        return jsonify({'error': estado['error'], 'logs': estado['logs'], 'trabajo_id': trabajo.id}), 500
         
-        # evaluar modelo
-        registros.append('evaluando rendimiento del modelo...')
-        evaluacion = entrenador.evaluar()
-        registros.append('evaluacion completada!')
+    return jsonify({
+        'message': 'busqueda completada',
+        'logs': estado['logs'],
+        'trabajo_id': trabajo.id,
+        'tiempos_fases': estado['tiempos_fases'],
+        **estado['resultado']
+    }), 200
+
+
+@app.route('/modelo/trabajos', methods=['GET'])
+def listar_trabajos():
+    """lista los trabajos de entrenamiento recientes (mas nuevo primero)"""
+    return jsonify({'trabajos': gestor_trabajos.listar()}), 200
+
+
+@app.route('/modelo/trabajos/<id_trabajo>', methods=['GET'])
+def consultar_trabajo(id_trabajo):
+    """
+    progreso de un trabajo: estado, fase, tiempos por fase, costo por iteracion
+    y resultado final; ?desde=n retorna solo los costos a partir de la iteracion n
+    """
+    trabajo = gestor_trabajos.obtener(id_trabajo)
+    if trabajo is None:
+        return jsonify({'error': 'trabajo no encontrado'}), 404
+    
+    try:
+        desde = int(request.args.get('desde', 0))
+    except ValueError:
+        return jsonify({'error': 'desde debe ser un entero'}), 400
+        
+    return jsonify(trabajo.a_dict(desde)), 200
+
+
+@app.route('/modelo/versiones', methods=['GET'])
+def listar_versiones():
+    """versiones registradas con hiperparametros, metricas y huella de datos"""
+    try:
+        return jsonify(registro_modelos.listar()), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/modelo/versiones/<int:version>/promover', methods=['POST'])
+def promover_version(version):
+    """
+    promueve una version (p.ej. para volver a una anterior): pasa a ser el modelo
+    de servicio y el que se carga al iniciar; las instantaneas de versiones ya
+    usadas se mantienen en memoria, asi que volver a ellas no lee disco
+    """
+    try:
+        servicio = registro_modelos.servicio(version)
+        info = registro_modelos.promover(version, ruta_actual=os.path.join(DIRECTORIO_DATOS, ARCHIVO_MODELO))
         
-        # guardar modelo
-        registros.append('guardando modelo entrenado...')
-        directorio_datos = os.path.join(os.path.dirname(__file__), 'data')
-        rutas = entrenador.guardar_modelo(directorio_datos)
-        registros.append(f"modelo guardado en {rutas['modelo_path']}")
+        # el entrenador se carga del artefacto promovido solo si se necesita
+        publicar_modelo(None, servicio)
         
         return jsonify({
-            'message': 'modelo entrenado exitosamente',
-            'logs': registros,
-            'model_info': info_modelo,
-            'preparacion_datos': info_preparacion,
-            'evaluacion': evaluacion,
-            'rutas': rutas
+            'message': f'version {version} promovida',
+            'version': info,
+            'huella_modelo': servicio.huella
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 404
     except Exception as e:
-        return jsonify({'error': str(e), 'logs': registros if 'registros' in locals() else []}), 500
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/modelo/exportar-plegado', methods=['POST'])
+def exportar_modelo_plegado():
+    """
+    exporta el modelo actual con la estandarizacion plegada en pesos y sesgo
+    (data/modelo_studentguard_plegado.sgm): recibe valores crudos y no necesita scaler
+    """
+    try:
+        actual = obtener_entrenador()
+        if not actual.entrenado:
+            return jsonify({'error': 'modelo no entrenado'}), 404
+        info = actual.exportar_modelo_plegado(DIRECTORIO_DATOS)
+        return jsonify({'message': 'modelo plegado exportado', **info}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
 
 @app.route('/modelo/evaluacion', methods=['GET'])
@@ -141,13 +659,15 @@ def obtener_evaluacion():
     """
     obtiene metricas de evaluacion del modelo entrenado
     """
-    global entrenador
+    # referencia local: un entrenamiento que termine mientras tanto no la cambia
+    actual = entrenador
     
-    if not entrenador.entrenado:
+    # un modelo cargado de disco no trae conjunto de prueba para evaluar
+    if actual is None or not actual.entrenado or actual.X_test is None:
         return jsonify({'error': 'modelo no entrenado'}), 404
         
     try:
-        evaluacion = entrenador.evaluar()
+        evaluacion = actual.evaluar(n_jobs=CV_TRABAJADORES, backend=CV_BACKEND)
         
         # formatear metricas principales para el frontend
         metricas_formateadas = {
@@ -156,13 +676,16 @@ def obtener_evaluacion():
             'recall': f"{evaluacion['metricas_principales']['recall']:.2f}%",
             'f1_score': f"{evaluacion['metricas_principales']['f1_score']:.2f}%"
         }
+        if 'roc_auc' in evaluacion['metricas_principales']:
+            metricas_formateadas['roc_auc'] = f"{evaluacion['metricas_principales']['roc_auc']:.2f}%"
         
         return jsonify({
             'metricas': metricas_formateadas,
             'metricas_raw': evaluacion['metricas_principales'],
             'validacion_cruzada': evaluacion['validacion_cruzada'],
             'importancia_caracteristicas': evaluacion['importancia_caracteristicas'],
-            'reporte_completo': evaluacion['reporte_completo']
+            'reporte_completo': evaluacion['reporte_completo'],
+            'huella_modelo': evaluacion['huella_modelo']
         }), 200
         
     except Exception as e:
@@ -174,36 +697,22 @@ def predecir_individual():
     """
     realiza prediccion individual usando el modelo entrenado
     """
-    global entrenador
-    
-    # intentar cargar modelo si no esta en memoria
-    if not entrenador.entrenado:
-        try:
-            directorio_datos = os.path.join(os.path.dirname(__file__), 'data')
-            entrenador.cargar_modelo(directorio_datos)
-        except:
-            return jsonify({'error': 'modelo no encontrado, entrena el modelo primero'}), 404
+    # una sola lectura de la referencia: la instantanea no cambia durante la peticion
+    servicio = modelo_servicio
+    if servicio is None:
+        return jsonify({'error': 'modelo no encontrado, entrena el modelo primero'}), 404
     
     try:
         # obtener datos del request
         datos_estudiante = request.get_json()
         
-        # validar columnas requeridas
-        columnas_requeridas = [
-            'promedio_actual', 'asistencia_clases', 'tareas_entregadas',
-            'participacion_clase', 'horas_estudio', 'promedio_evaluaciones',
-            'cursos_reprobados', 'actividades_extracurriculares', 'reportes_disciplinarios'
-        ]
-        
-        for col in columnas_requeridas:
+        # validar columnas requeridas (las del preprocesamiento del modelo)
+        for col in servicio.transformador.columnas_entrada:
             if col not in datos_estudiante:
                 return jsonify({'error': f'falta columna {col}'}), 400
         
-        # extraer valores en el orden correcto
-        valores = [datos_estudiante[col] for col in columnas_requeridas]
-        
-        # realizar prediccion
-        resultado = entrenador.predecir(valores)
+        # el registro crudo se limpia y escala como los datos de entrenamiento
+        resultado = servicio.predecir_registro(datos_estudiante)
         
         return jsonify({
             'riesgo': resultado['riesgo'],
@@ -216,6 +725,52 @@ def predecir_individual():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/modelo/predecir-lote', methods=['POST'])
+def predecir_lote():
+    """
+    realiza prediccion para un lote de estudiantes (arreglo json o archivo csv)
+    todas las filas se evaluan en una sola multiplicacion de matrices
+    """
+    # una sola lectura de la referencia: la instantanea no cambia durante la peticion
+    servicio = modelo_servicio
+    if servicio is None:
+        return jsonify({'error': 'modelo no encontrado, entrena el modelo primero'}), 404
+    
+    try:
+        # la limpieza de lotes usa pandas: se importa con el primer lote
+        import pandas as pd
+        from models.procesador_datos import VALORES_NULOS
+        
+        # aceptar archivo csv o arreglo json de estudiantes
+        if 'file' in request.files:
+            lote = pd.read_csv(request.files['file'], na_values=VALORES_NULOS)
+        else:
+            datos_request = request.get_json(silent=True)
+            if not isinstance(datos_request, list):
+                return jsonify({'error': 'se esperaba un arreglo json o un archivo csv'}), 400
+            lote = pd.DataFrame(datos_request)
+        
+        if len(lote) == 0:
+            return jsonify({'error': 'lote vacio'}), 400
+        
+        # validar columnas requeridas (las del preprocesamiento del modelo)
+        columnas_faltantes = [col for col in servicio.transformador.columnas_entrada if col not in lote.columns]
+        if columnas_faltantes:
+            return jsonify({'error': f'faltan columnas {columnas_faltantes}'}), 400
+        
+        # limpieza, escalado y prediccion vectorizados sobre todo el lote
+        resultado = servicio.predecir_registros(lote)
+        
+        return jsonify(resultado), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+# el modelo de servicio se carga una sola vez al iniciar (tambien bajo gunicorn)
+cargar_modelo_inicial()
+
+
 if __name__ == '__main__':
     # inicia el servidor flask
     app.run(debug=True)
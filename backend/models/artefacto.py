@@ -0,0 +1,142 @@
+"""
+artefacto.py
+formato binario versionado para guardar modelos sin pickle
+un solo archivo: cabecera json + arreglos numpy alineados, cargables por mmap
+"""
+
+import numpy as np
+import hashlib
+import json
+import os
+import threading
+
+
+# firma al inicio del archivo y version del formato
+MAGIA = b'SGMODEL\x00'
+FORMATO_VERSION = 1
+
+# alineacion de cada arreglo dentro del archivo (permite mapearlos directamente)
+ALINEACION = 64
+
+
+def _alinear(posicion):
+    """siguiente posicion multiplo de ALINEACION"""
+    return -(-posicion // ALINEACION) * ALINEACION
+
+
+def ruta_temporal(ruta):
+    """temporal propio de este proceso e hilo para escribir ruta y reemplazarla despues"""
+    return f'{ruta}.{os.getpid()}.{threading.get_ident()}.tmp'
+
+
+def _calcular_checksum(metadatos, arreglos):
+    """sha256 de los metadatos (json canonico) y del contenido de cada arreglo"""
+    h = hashlib.sha256()
+    h.update(json.dumps(metadatos, sort_keys=True).encode())
+    for nombre in sorted(arreglos):
+        h.update(nombre.encode())
+        h.update(np.ascontiguousarray(arreglos[nombre]).tobytes())
+    return h.hexdigest()
+
+
+def es_artefacto(ruta):
+    """indica si el archivo tiene la firma del formato binario"""
+    try:
+        with open(ruta, 'rb') as f:
+            return f.read(len(MAGIA)) == MAGIA
+    except OSError:
+        return False
+
+
+def guardar_artefacto(ruta, arreglos, metadatos):
+    """
+    guarda arreglos numpy y metadatos (serializables a json) en un solo archivo
+
+    estructura: MAGIA | longitud de cabecera (uint64 little endian) | cabecera json | arreglos
+    la escritura va a un temporal y se reemplaza al final, nunca queda un archivo a medias
+    """
+    arreglos = {nombre: np.ascontiguousarray(a) for nombre, a in arreglos.items()}
+    for nombre, a in arreglos.items():
+        if a.dtype.hasobject:
+            raise ValueError(f"arreglo '{nombre}' con dtype object no soportado")
+
+    # la cabecera describe cada arreglo; los desplazamientos son relativos al inicio de los datos
+    descripcion = {}
+    posicion = 0
+    for nombre in sorted(arreglos):
+        a = arreglos[nombre]
+        posicion = _alinear(posicion)
+        descripcion[nombre] = {
+            'dtype': a.dtype.str,
+            'forma': list(a.shape),
+            'desplazamiento': posicion
+        }
+        posicion += a.nbytes
+
+    cabecera = {
+        'formato': 'studentguard-modelo',
+        'version': FORMATO_VERSION,
+        'metadatos': metadatos,
+        'arreglos': descripcion,
+        'checksum': _calcular_checksum(metadatos, arreglos)
+    }
+    cabecera_bytes = json.dumps(cabecera).encode()
+    inicio_datos = _alinear(len(MAGIA) + 8 + len(cabecera_bytes))
+
+    directorio = os.path.dirname(ruta)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+
+    temporal = ruta_temporal(ruta)
+    with open(temporal, 'wb') as f:
+        f.write(MAGIA)
+        f.write(np.uint64(len(cabecera_bytes)).astype('<u8').tobytes())
+        f.write(cabecera_bytes)
+        for nombre in sorted(arreglos):
+            f.seek(inicio_datos + descripcion[nombre]['desplazamiento'])
+            f.write(arreglos[nombre].tobytes())
+    os.replace(temporal, ruta)
+
+    return cabecera['checksum']
+
+
+def cargar_artefacto(ruta, mmap=True, verificar=True):
+    """
+    carga un artefacto guardado con guardar_artefacto
+
+    con mmap=True los arreglos son vistas de solo lectura del archivo mapeado
+    retorna (arreglos, metadatos, cabecera)
+    """
+    with open(ruta, 'rb') as f:
+        if f.read(len(MAGIA)) != MAGIA:
+            raise ValueError(f"{ruta} no es un artefacto de modelo valido")
+        longitud = int(np.frombuffer(f.read(8), dtype='<u8')[0])
+        cabecera = json.loads(f.read(longitud).decode())
+
+    if cabecera.get('version', 0) > FORMATO_VERSION:
+        raise ValueError(f"version de artefacto no soportada: {cabecera.get('version')}")
+
+    inicio_datos = _alinear(len(MAGIA) + 8 + longitud)
+    descripcion = cabecera['arreglos']
+
+    if mmap and descripcion:
+        contenido = np.memmap(ruta, dtype=np.uint8, mode='r')
+    else:
+        with open(ruta, 'rb') as f:
+            contenido = np.frombuffer(f.read(), dtype=np.uint8)
+
+    arreglos = {}
+    for nombre, info in descripcion.items():
+        dtype = np.dtype(info['dtype'])
+        forma = tuple(info['forma'])
+        cantidad = int(np.prod(forma, dtype=np.int64))
+        inicio = inicio_datos + info['desplazamiento']
+        fin = inicio + cantidad * dtype.itemsize
+        if fin > len(contenido):
+            raise ValueError(f"artefacto truncado: falta el arreglo '{nombre}'")
+        arreglos[nombre] = np.ndarray(forma, dtype=dtype, buffer=contenido[inicio:fin])
+
+    if verificar and _calcular_checksum(cabecera['metadatos'], arreglos) != cabecera['checksum']:
+        raise ValueError("artefacto corrupto: checksum invalido")
+
+    return arreglos, cabecera['metadatos'], cabecera
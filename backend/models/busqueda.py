@@ -0,0 +1,171 @@
+"""
+busqueda.py
+busqueda de hiperparametros (grid o aleatoria) con eliminacion sucesiva (halving)
+"""
+
+import numpy as np
+import itertools
+import math
+import time
+from .clasificador_estudiante import ClasificadorEstudiante
+from .evaluador import EvaluadorModelo
+
+
+# hiperparametros que se pueden buscar (los del constructor de ClasificadorEstudiante)
+PARAMETROS_BUSQUEDA = tuple(ClasificadorEstudiante().get_params())
+
+# limite de configuraciones por busqueda
+MAX_CANDIDATOS = 500
+
+MODOS_BUSQUEDA = ('grid', 'aleatoria')
+
+
+def _valores(valor):
+    """un valor escalar se trata como lista de un solo elemento"""
+    return valor if isinstance(valor, list) else [valor]
+
+
+def _muestrear(rng, especificacion):
+    """
+    un valor aleatorio de la especificacion: lista (se elige un elemento) o
+    rango {'min', 'max', 'escala': 'lineal'|'log', 'entero': bool}
+    """
+    if not isinstance(especificacion, dict):
+        opciones = _valores(especificacion)
+        return opciones[rng.randint(len(opciones))]
+
+    minimo, maximo = float(especificacion['min']), float(especificacion['max'])
+    if minimo > maximo:
+        raise ValueError(f"rango invalido: min {minimo} > max {maximo}")
+    if especificacion.get('escala', 'lineal') == 'log':
+        if minimo <= 0:
+            raise ValueError("la escala log requiere min > 0")
+        valor = math.exp(rng.uniform(math.log(minimo), math.log(maximo)))
+    else:
+        valor = rng.uniform(minimo, maximo)
+    return int(round(valor)) if especificacion.get('entero') else float(valor)
+
+
+def generar_candidatos(espacio, modo='grid', n_candidatos=10, semilla=42):
+    """
+    configuraciones a evaluar a partir del espacio de busqueda
+    grid: producto cartesiano de las listas de valores
+    aleatoria: n_candidatos configuraciones muestreadas (listas o rangos)
+    """
+    if not espacio:
+        raise ValueError("espacio de busqueda vacio")
+    desconocidos = [p for p in espacio if p not in PARAMETROS_BUSQUEDA]
+    if desconocidos:
+        raise ValueError(f"parametros no soportados: {desconocidos}. opciones: {list(PARAMETROS_BUSQUEDA)}")
+    if modo not in MODOS_BUSQUEDA:
+        raise ValueError(f"modo desconocido: {modo}. opciones: {list(MODOS_BUSQUEDA)}")
+
+    nombres = list(espacio)
+    if modo == 'grid':
+        if any(isinstance(espacio[p], dict) for p in nombres):
+            raise ValueError("el modo grid requiere listas de valores, no rangos")
+        total = int(np.prod([len(_valores(espacio[p])) for p in nombres]))
+        if total > MAX_CANDIDATOS:
+            raise ValueError(f"la grilla tiene {total} configuraciones (maximo {MAX_CANDIDATOS})")
+        candidatos = [dict(zip(nombres, combinacion))
+                      for combinacion in itertools.product(*(_valores(espacio[p]) for p in nombres))]
+    else:
+        n_candidatos = int(n_candidatos)
+        if not 1 <= n_candidatos <= MAX_CANDIDATOS:
+            raise ValueError(f"n_candidatos debe estar entre 1 y {MAX_CANDIDATOS}")
+        rng = np.random.RandomState(semilla)
+        candidatos = [{p: _muestrear(rng, espacio[p]) for p in nombres} for _ in range(n_candidatos)]
+
+    # quitar repetidos conservando el orden y validar cada configuracion (tipos y
+    # rangos, en el constructor) antes de encolar la busqueda
+    unicos = []
+    for candidato in candidatos:
+        if candidato not in unicos:
+            ClasificadorEstudiante(**candidato)
+            unicos.append(candidato)
+    return unicos
+
+
+def busqueda_halving(X, y, candidatos, cv=5, factor=3, min_muestras=None, halving=True,
+                     n_jobs=None, backend='process', callback=None):
+    """
+    evalua los candidatos con validacion cruzada sobre X, y (ya barajados y estandarizados)
+
+    con halving=True (eliminacion sucesiva) la primera ronda usa pocas filas y
+    todas las configuraciones; en cada ronda sobrevive 1/factor de ellas y las
+    filas se multiplican por factor, hasta usar todas en la ultima ronda
+    callback (opcional) recibe el resumen de cada ronda terminada
+    """
+    if not candidatos:
+        raise ValueError("no hay candidatos para evaluar")
+    factor = int(factor)
+    if factor < 2:
+        raise ValueError("factor debe ser >= 2")
+
+    n_total = len(X)
+    if min_muestras is None:
+        # al menos 10 filas por fold en la primera ronda
+        min_muestras = 10 * cv
+    min_muestras = max(cv, min(int(min_muestras), n_total))
+
+    # rondas: se evalua mientras quede mas de un candidato (un candidato solo no se
+    # vuelve a evaluar), limitadas por las filas disponibles
+    n_rondas = 1
+    if halving and len(candidatos) > 1:
+        n_rondas, restantes = 0, len(candidatos)
+        while restantes > 1:
+            restantes = math.ceil(restantes / factor)
+            n_rondas += 1
+        max_rondas = int(math.floor(math.log(n_total / min_muestras, factor))) + 1
+        n_rondas = max(1, min(n_rondas, max_rondas))
+
+    evaluador = EvaluadorModelo()
+    sobrevivientes = [dict(c) for c in candidatos]
+    rondas = []
+    entrenamientos = 0
+    inicio_busqueda = time.perf_counter()
+
+    for ronda in range(n_rondas):
+        inicio = time.perf_counter()
+        # la ultima ronda siempre usa todas las filas
+        n_filas = n_total if ronda == n_rondas - 1 else max(min_muestras, n_total // factor ** (n_rondas - 1 - ronda))
+
+        scores = evaluador.cross_validation_scores(
+            sobrevivientes, X, y, cv=cv, n_jobs=n_jobs, backend=backend, n_filas=n_filas
+        )
+        entrenamientos += sum(len(s) for s in scores)
+
+        resultados = [
+            {
+                'parametros': parametros,
+                'score_medio': float(np.mean(s)),
+                'desviacion': float(np.std(s)),
+                'scores': s
+            }
+            for parametros, s in zip(sobrevivientes, scores)
+        ]
+        # orden estable: a igual score gana la configuracion listada primero
+        resultados.sort(key=lambda r: -r['score_medio'])
+
+        resumen = {
+            'ronda': ronda + 1,
+            'muestras': int(n_filas),
+            'candidatos': len(resultados),
+            'duracion': round(time.perf_counter() - inicio, 4),
+            'resultados': resultados
+        }
+        rondas.append(resumen)
+        if callback is not None:
+            callback(resumen)
+
+        # solo avanzan los mejores 1/factor
+        if ronda < n_rondas - 1:
+            sobrevivientes = [r['parametros'] for r in resultados[:max(1, math.ceil(len(resultados) / factor))]]
+
+    return {
+        'mejor': rondas[-1]['resultados'][0],
+        'rondas': rondas,
+        'total_candidatos': len(candidatos),
+        'total_entrenamientos': entrenamientos,
+        'duracion': round(time.perf_counter() - inicio_busqueda, 4)
+    }
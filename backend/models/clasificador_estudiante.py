@@ -5,8 +5,61 @@ implementacion desde cero usando solo numpy
 """
 
 import numpy as np
+import numbers
 import pickle
-import os
+from .artefacto import guardar_artefacto, cargar_artefacto, es_artefacto
+
+
+class _FilasPorBloques:
+    """
+    filas de X seleccionadas por indices, recorridas por bloques sin copiar la
+    matriz completa: los tramos consecutivos largos son vistas (X[a:b]) y los
+    indices sueltos se copian de a un bloque (filas_bloque filas) en cada recorrido
+    """
+
+    def __init__(self, X, indices=None, filas_bloque=65536, min_tramo=256):
+        self.X = X
+        self.piezas = []
+        if indices is None:
+            self.n = len(X)
+            self.piezas.append(slice(0, self.n))
+            return
+
+        indices = np.asarray(indices)
+        self.n = len(indices)
+        cortes = np.flatnonzero(np.diff(indices) != 1) + 1
+        sueltos = []
+
+        def agregar_sueltos():
+            if sueltos:
+                pendientes = np.concatenate(sueltos)
+                for inicio in range(0, len(pendientes), filas_bloque):
+                    self.piezas.append(pendientes[inicio:inicio + filas_bloque])
+                sueltos.clear()
+
+        # el orden de las piezas respeta el de indices (alineado con las etiquetas)
+        for tramo in np.split(indices, cortes):
+            if len(tramo) >= min_tramo:
+                agregar_sueltos()
+                self.piezas.append(slice(int(tramo[0]), int(tramo[-1]) + 1))
+            elif len(tramo):
+                sueltos.append(tramo)
+        agregar_sueltos()
+
+    def __len__(self):
+        return self.n
+
+    @property
+    def shape(self):
+        return (self.n, self.X.shape[1])
+
+    def bloques(self):
+        """(posicion de la primera fila, bloque de filas) en orden"""
+        inicio = 0
+        for pieza in self.piezas:
+            bloque = self.X[pieza]
+            yield inicio, bloque
+            inicio += len(bloque)
 
 
 class ClasificadorEstudiante:
@@ -15,10 +68,32 @@ class ClasificadorEstudiante:
     implementado desde cero sin usar modelos preentrenados
     """
     
-    def __init__(self, learning_rate=0.01, max_iterations=1000, regularization=0.01):
+    # optimizadores disponibles; 'gd', 'lbfgs' y 'newton' usan todo el conjunto en cada iteracion
+    SOLVERS = ('gd', 'sgd', 'momentum', 'adam', 'lbfgs', 'newton')
+    SOLVERS_SEGUNDO_ORDEN = ('lbfgs', 'newton')
+    
+    def __init__(self, learning_rate=0.01, max_iterations=1000, regularization=0.01,
+                 solver='gd', batch_size=None, momentum=0.9, tol=1e-5, n_iter_no_change=10,
+                 early_stopping=False, validation_fraction=0.1, warm_start=False):
+        if solver not in self.SOLVERS:
+            raise ValueError(f"solver desconocido: {solver}. opciones: {list(self.SOLVERS)}")
+        self._validar_parametros(learning_rate, max_iterations, regularization, batch_size, momentum,
+                                 tol, n_iter_no_change, early_stopping, validation_fraction, warm_start)
         self.learning_rate = learning_rate
         self.max_iterations = max_iterations
         self.regularization = regularization
+        self.solver = solver
+        self.batch_size = batch_size
+        self.momentum = momentum
+        # criterio de convergencia: detener si el costo no mejora mas de tol
+        # durante n_iter_no_change iteraciones (tol=None lo desactiva)
+        self.tol = tol
+        self.n_iter_no_change = n_iter_no_change
+        self.early_stopping = early_stopping
+        self.validation_fraction = validation_fraction
+        # warm_start: fit parte de los pesos actuales (si son compatibles) en lugar de pesos aleatorios
+        self.warm_start = warm_start
+        self.n_iter_ = 0
         self.weights = None
         self.bias = None
         self.classes = None
@@ -33,16 +108,10 @@ class ClasificadorEstudiante:
         exp_z = np.exp(z_shifted)
         return exp_z / np.sum(exp_z, axis=1, keepdims=True)
         
-    def _one_hot_encode(self, y):
-        """codifica etiquetas en formato one-hot"""
-        n_classes = len(self.classes)
-        n_samples = len(y)
-        y_encoded = np.zeros((n_samples, n_classes))
-        
-        class_to_idx = {cls: idx for idx, cls in enumerate(self.classes)}
-        for i, cls in enumerate(y):
-            y_encoded[i, class_to_idx[cls]] = 1
-            
+    def _one_hot_encode(self, y_idx, dtype=np.float64):
+        """codifica indices enteros de clase en formato one-hot"""
+        y_encoded = np.zeros((len(y_idx), len(self.classes)), dtype=dtype)
+        y_encoded[np.arange(len(y_idx)), y_idx] = 1
         return y_encoded
         
     def _compute_cost(self, y_true, y_pred):
@@ -61,15 +130,31 @@ class ClasificadorEstudiante:
             
         return cost
         
-    def fit(self, X, y):
-        """entrena el modelo"""
-        # convertir a numpy arrays
-        X = np.array(X, dtype=np.float64)
-        y = np.array(y)
+    def fit(self, X, y, indices=None, callback=None):
+        """
+        entrena el modelo
+        indices (opcional) selecciona las filas de X a usar sin copiar la matriz:
+        los solvers de mini-lotes indexan X por lote; los de lote completo
+        acumulan los gradientes por bloques (vistas de los tramos consecutivos)
+        callback (opcional) se llama en cada iteracion con (iteracion, costo)
+        """
+        # convertir a numpy arrays sin copiar si X ya es float32/float64 (p.ej. memmap)
+        X = np.asarray(X)
+        if X.dtype not in (np.float32, np.float64):
+            X = X.astype(np.float64)
+        y = np.asarray(y)
         
+        filas = None
+        if indices is not None:
+            filas = np.asarray(indices)
+            y = y[filas]
+        lote_completo = self.solver == 'gd' or self.solver in self.SOLVERS_SEGUNDO_ORDEN
+                
         # obtener dimensiones
-        n_samples, n_features = X.shape
-        self.classes = np.unique(y)
+        n_samples, n_features = len(y), X.shape[1]
+        # codificar etiquetas a enteros una sola vez
+        clases_previas = self.classes
+        self.classes, y_idx = np.unique(y, return_inverse=True)
         n_classes = len(self.classes)
         
         # guardar nombres de caracteristicas
@@ -78,66 +163,370 @@ class ClasificadorEstudiante:
         else:
             self.feature_names = [f'feature_{i}' for i in range(n_features)]
             
-        # inicializar pesos aleatoriamente
-        np.random.seed(42)
-        self.weights = np.random.normal(0, 0.01, (n_features, n_classes))
-        self.bias = np.zeros((1, n_classes))
+        # generador local: los folds de validacion cruzada pueden entrenarse en paralelo
+        rng = np.random.RandomState(42)
+        # los parametros usan el mismo tipo que X para no convertir la matriz en cada producto
+        if self.warm_start and self._parametros_compatibles(clases_previas, n_features):
+            # continuar desde los pesos actuales (copias: pueden venir de un artefacto de solo lectura)
+            self.weights = np.array(self.weights, dtype=X.dtype)
+            self.bias = np.array(self.bias, dtype=X.dtype).reshape(1, n_classes)
+        else:
+            # inicializar pesos aleatoriamente
+            self.weights = rng.normal(0, 0.01, (n_features, n_classes)).astype(X.dtype)
+            self.bias = np.zeros((1, n_classes), dtype=X.dtype)
         
         # codificar etiquetas
-        y_encoded = self._one_hot_encode(y)
+        y_encoded = self._one_hot_encode(y_idx.ravel(), dtype=X.dtype)
         
-        # entrenamiento por descenso de gradiente
+        # separar conjunto de validacion para parada temprana
+        X_val = None
+        if self.early_stopping:
+            n_val = max(1, int(round(self.validation_fraction * n_samples)))
+            if n_val >= n_samples:
+                raise ValueError("validation_fraction deja el entrenamiento sin muestras")
+            permutacion = rng.permutation(n_samples)
+            val_idx, train_idx = permutacion[:n_val], permutacion[n_val:]
+            if lote_completo:
+                # el gradiente de lote completo no depende del orden de las filas:
+                # ordenadas, las de entrenamiento quedan en tramos consecutivos
+                train_idx = np.sort(train_idx)
+            y_val_encoded, y_encoded = y_encoded[val_idx], y_encoded[train_idx]
+            if filas is not None:
+                X_val = X[filas[val_idx]]
+                filas = filas[train_idx]
+            else:
+                X_val = X[val_idx]
+                filas = train_idx
+            n_samples = len(y_encoded)
+            
+        # lote completo: las filas de entrenamiento se recorren por bloques, sin copiarlas
+        datos = _FilasPorBloques(X, filas) if lote_completo else None
+        
+        # entrenamiento por descenso de gradiente (cada iteracion es una epoca)
         self.training_history = []
+        self._reiniciar_optimizador()
         
-        for iteration in range(self.max_iterations):
-            # forward pass
-            z = np.dot(X, self.weights) + self.bias
-            predictions = self._softmax(z)
+        # tamaño de lote: todo el conjunto para 'gd' y segundo orden, mini-lotes para el resto
+        if lote_completo:
+            batch_size = n_samples
+        else:
+            batch_size = int(self.batch_size) if self.batch_size else 32
+            batch_size = max(1, min(batch_size, n_samples))
             
-            # calcular costo
-            cost = self._compute_cost(y_encoded, predictions)
+        # con parada temprana siempre se vigila la validacion, aunque tol sea None
+        tol = self.tol
+        if tol is None and self.early_stopping:
+            tol = 0.0
+        mejor_costo = np.inf
+        sin_mejora = 0
+        mejores_parametros = None
+        self.n_iter_ = 0
+        
+        for iteration in range(self.max_iterations):
+            if self.solver in self.SOLVERS_SEGUNDO_ORDEN:
+                cost = self._paso_segundo_orden(datos, y_encoded)
+            elif lote_completo:
+                cost = self._paso_gradiente(datos, y_encoded)
+            else:
+                # barajar en cada epoca y recorrer mini-lotes
+                indices = rng.permutation(n_samples)
+                cost = 0.0
+                for start in range(0, n_samples, batch_size):
+                    batch_idx = indices[start:start + batch_size]
+                    X_batch = X[filas[batch_idx]] if filas is not None else X[batch_idx]
+                    batch_cost = self._paso_gradiente(X_batch, y_encoded[batch_idx])
+                    cost += batch_cost * len(batch_idx)
+                cost /= n_samples
+                
             self.training_history.append(cost)
-            
-            # calcular gradientes
-            dw = np.dot(X.T, (predictions - y_encoded)) / n_samples
-            db = np.mean(predictions - y_encoded, axis=0, keepdims=True)
-            
-            # agregar regularizacion a los pesos
-            dw += self.regularization * self.weights
-            
-            # actualizar parametros
-            self.weights -= self.learning_rate * dw
-            self.bias -= self.learning_rate * db
+            self.n_iter_ = iteration + 1
+            if callback is not None:
+                callback(self.n_iter_, float(cost))
             
             # verificar convergencia cada 100 iteraciones
             if iteration % 100 == 0:
                 print(f'iteracion {iteration}, costo: {cost:.4f}')
                 
+            # lbfgs / newton detectan por si mismos un optimo (gradiente nulo)
+            if self._convergido:
+                print(f'convergencia en iteracion {iteration}: gradiente despreciable')
+                break
+                
+            if tol is None:
+                continue
+                
+            # costo vigilado: validacion si hay parada temprana, entrenamiento si no
+            if X_val is not None:
+                z_val = np.dot(X_val, self.weights) + self.bias
+                costo_vigilado = self._compute_cost(y_val_encoded, self._softmax(z_val))
+            else:
+                costo_vigilado = cost
+                
+            if costo_vigilado < mejor_costo - tol:
+                mejor_costo = costo_vigilado
+                sin_mejora = 0
+                if X_val is not None:
+                    mejores_parametros = (self.weights.copy(), self.bias.copy())
+            else:
+                sin_mejora += 1
+                
+            if sin_mejora >= self.n_iter_no_change:
+                print(f'convergencia en iteracion {iteration}: sin mejora en {self.n_iter_no_change} iteraciones')
+                break
+                
+        # con parada temprana se conservan los parametros con mejor validacion
+        if mejores_parametros is not None:
+            self.weights, self.bias = mejores_parametros
+            
         self.is_fitted = True
         print(f'entrenamiento completado. costo final: {self.training_history[-1]:.4f}')
         
-    def predict(self, X):
-        """predice clases"""
-        if not self.is_fitted:
-            raise ValueError("modelo no entrenado. ejecuta fit() primero")
+    def _parametros_compatibles(self, clases_previas, n_features):
+        """los pesos actuales sirven de punto de partida (mismas clases y caracteristicas)"""
+        if self.weights is None or clases_previas is None:
+            return False
+        if [str(c) for c in clases_previas] != [str(c) for c in self.classes]:
+            print('warm_start: las clases cambiaron, se inicializa desde cero')
+            return False
+        return np.shape(self.weights) == (n_features, len(self.classes))
+        
+    def set_initial_params(self, weights, bias, classes):
+        """punto de partida para fit con warm_start (p.ej. pesos de otro modelo entrenado)"""
+        self.weights = np.array(weights, dtype=np.float64)
+        self.bias = np.array(bias, dtype=np.float64).reshape(1, -1)
+        self.classes = np.asarray(classes)
+        self.is_fitted = True
+        
+    def _reiniciar_optimizador(self):
+        """reinicia el estado interno de momentum / adam"""
+        self._velocidad_w = np.zeros_like(self.weights)
+        self._velocidad_b = np.zeros_like(self.bias)
+        self._cuadrado_w = np.zeros_like(self.weights)
+        self._cuadrado_b = np.zeros_like(self.bias)
+        self._paso = 0
+        
+        # estado de lbfgs / newton: historial de curvatura y evaluacion en el punto actual
+        self._historial_s = []
+        self._historial_y = []
+        self._evaluacion_actual = None
+        self._convergido = False
+        
+    def _probabilidades_bloques(self, datos):
+        """softmax de X W + b calculada bloque a bloque (datos: _FilasPorBloques)"""
+        probabilidades = np.empty((len(datos), self.weights.shape[1]),
+                                  dtype=np.result_type(datos.X.dtype, self.weights.dtype))
+        for inicio, bloque in datos.bloques():
+            probabilidades[inicio:inicio + len(bloque)] = self._softmax(np.dot(bloque, self.weights) + self.bias)
+        return probabilidades
+        
+    @staticmethod
+    def _producto_transpuesto(datos, matriz):
+        """X^T M acumulado bloque a bloque (datos: _FilasPorBloques)"""
+        total = np.zeros((datos.shape[1], matriz.shape[1]), dtype=matriz.dtype)
+        for inicio, bloque in datos.bloques():
+            total += np.dot(bloque.T, matriz[inicio:inicio + len(bloque)])
+        return total
+        
+    def _paso_gradiente(self, X, y_encoded):
+        """
+        calcula gradientes sobre un lote, actualiza parametros y retorna el costo
+        X: matriz del lote o _FilasPorBloques (lote completo sin copiar filas)
+        """
+        datos = X if isinstance(X, _FilasPorBloques) else _FilasPorBloques(X)
+        n_samples = len(datos)
+        
+        # forward pass
+        predictions = self._probabilidades_bloques(datos)
+        
+        # calcular costo
+        cost = self._compute_cost(y_encoded, predictions)
+        
+        # calcular gradientes
+        error = predictions - y_encoded
+        dw = self._producto_transpuesto(datos, error) / n_samples
+        db = np.mean(error, axis=0, keepdims=True)
+        
+        # agregar regularizacion a los pesos
+        dw += self.regularization * self.weights
+        
+        # actualizar parametros segun el optimizador
+        if self.solver == 'momentum':
+            self._velocidad_w = self.momentum * self._velocidad_w - self.learning_rate * dw
+            self._velocidad_b = self.momentum * self._velocidad_b - self.learning_rate * db
+            self.weights += self._velocidad_w
+            self.bias += self._velocidad_b
+        elif self.solver == 'adam':
+            beta1, beta2, epsilon = 0.9, 0.999, 1e-8
+            self._paso += 1
+            self._velocidad_w = beta1 * self._velocidad_w + (1 - beta1) * dw
+            self._velocidad_b = beta1 * self._velocidad_b + (1 - beta1) * db
+            self._cuadrado_w = beta2 * self._cuadrado_w + (1 - beta2) * dw ** 2
+            self._cuadrado_b = beta2 * self._cuadrado_b + (1 - beta2) * db ** 2
+            correccion1 = 1 - beta1 ** self._paso
+            correccion2 = 1 - beta2 ** self._paso
+            self.weights -= self.learning_rate * (self._velocidad_w / correccion1) / (np.sqrt(self._cuadrado_w / correccion2) + epsilon)
+            self.bias -= self.learning_rate * (self._velocidad_b / correccion1) / (np.sqrt(self._cuadrado_b / correccion2) + epsilon)
+        else:
+            self.weights -= self.learning_rate * dw
+            self.bias -= self.learning_rate * db
             
-        X = np.array(X, dtype=np.float64)
-        z = np.dot(X, self.weights) + self.bias
-        probabilities = self._softmax(z)
+        return cost
         
-        # retornar clase con mayor probabilidad
-        predictions = np.argmax(probabilities, axis=1)
-        return np.array([self.classes[pred] for pred in predictions])
+    def _evaluar_objetivo(self, datos, y_encoded):
+        """
+        calcula costo, gradiente plano y probabilidades en los parametros actuales
+        el gradiente corresponde exactamente a _compute_cost (penalizacion l2 incluida)
+        """
+        n_samples = len(datos)
+        predictions = self._probabilidades_bloques(datos)
+        cost = self._compute_cost(y_encoded, predictions)
         
-    def predict_proba(self, X):
-        """predice probabilidades"""
+        error = predictions - y_encoded
+        dw = self._producto_transpuesto(datos, error) / n_samples + 2 * self.regularization * self.weights
+        db = np.mean(error, axis=0)
+        return cost, np.concatenate([dw.ravel(), db]), predictions
+        
+    def _parametros_planos(self):
+        """retorna pesos y bias como un solo vector"""
+        return np.concatenate([self.weights.ravel(), self.bias.ravel()])
+        
+    def _asignar_parametros(self, theta):
+        """asigna pesos y bias desde un vector plano"""
+        n_features, n_classes = self.weights.shape
+        self.weights = theta[:n_features * n_classes].reshape(n_features, n_classes).copy()
+        self.bias = theta[n_features * n_classes:].reshape(1, n_classes).copy()
+        
+    def _direccion_lbfgs(self, gradiente):
+        """recursion de dos ciclos de lbfgs para aproximar -H^-1 g"""
+        q = gradiente.copy()
+        alphas = []
+        for s_k, y_k in reversed(list(zip(self._historial_s, self._historial_y))):
+            rho = 1.0 / np.dot(y_k, s_k)
+            alpha = rho * np.dot(s_k, q)
+            q -= alpha * y_k
+            alphas.append((rho, alpha))
+            
+        # escalado inicial con el par de curvatura mas reciente
+        if self._historial_s:
+            s_k, y_k = self._historial_s[-1], self._historial_y[-1]
+            q *= np.dot(s_k, y_k) / np.dot(y_k, y_k)
+            
+        for (s_k, y_k), (rho, alpha) in zip(zip(self._historial_s, self._historial_y), reversed(alphas)):
+            beta = rho * np.dot(y_k, q)
+            q += (alpha - beta) * s_k
+        return -q
+        
+    def _direccion_newton(self, datos, predictions, gradiente):
+        """resuelve el sistema de newton con el hessiano exacto de la softmax"""
+        n_samples, n_features = datos.shape
+        n_classes = predictions.shape[1]
+        
+        # bloque (k, l): X~^T diag(p_k (delta_kl - p_l)) X~ / n, con X~ = [X, 1],
+        # acumulado sobre los bloques de filas
+        bloques_kl = {(k, l): np.zeros((n_features + 1, n_features + 1))
+                      for k in range(n_classes) for l in range(k, n_classes)}
+        for inicio, filas_x in datos.bloques():
+            p = predictions[inicio:inicio + len(filas_x)]
+            for (k, l), bloque in bloques_kl.items():
+                w = p[:, k] * ((k == l) - p[:, l])
+                Xw = filas_x * w[:, None]
+                bloque[:n_features, :n_features] += np.dot(Xw.T, filas_x)
+                bloque[:n_features, n_features] += np.sum(Xw, axis=0)
+                bloque[n_features, n_features] += np.sum(w)
+                
+        hessiano = np.zeros((n_features + 1, n_classes, n_features + 1, n_classes))
+        for (k, l), bloque in bloques_kl.items():
+            bloque[n_features, :n_features] = bloque[:n_features, n_features]
+            hessiano[:, k, :, l] = bloque / n_samples
+            hessiano[:, l, :, k] = bloque / n_samples
+                
+        n_params = (n_features + 1) * n_classes
+        hessiano = hessiano.reshape(n_params, n_params)
+        
+        # regularizacion l2 solo sobre los pesos; amortiguamiento porque la softmax
+        # esta sobreparametrizada y el hessiano es singular en la direccion del bias
+        diagonal = np.full(n_params, 1e-8)
+        diagonal[:n_features * n_classes] += 2 * self.regularization
+        hessiano[np.diag_indices(n_params)] += diagonal
+        return -np.linalg.solve(hessiano, gradiente)
+        
+    def _paso_segundo_orden(self, datos, y_encoded, memoria=10):
+        """
+        paso de lbfgs o newton con busqueda lineal de armijo; retorna el costo previo
+        datos: _FilasPorBloques con las filas de entrenamiento
+        """
+        if self._evaluacion_actual is None:
+            self._evaluacion_actual = self._evaluar_objetivo(datos, y_encoded)
+        cost, gradiente, predictions = self._evaluacion_actual
+        
+        if np.max(np.abs(gradiente)) < 1e-10:
+            self._convergido = True
+            return cost
+            
+        if self.solver == 'newton':
+            direccion = self._direccion_newton(datos, predictions, gradiente)
+        else:
+            direccion = self._direccion_lbfgs(gradiente)
+            
+        # si la direccion no es de descenso se usa el gradiente
+        pendiente = np.dot(gradiente, direccion)
+        if pendiente >= 0:
+            direccion = -gradiente
+            pendiente = -np.dot(gradiente, gradiente)
+            
+        # busqueda lineal hacia atras con condicion de armijo
+        theta = self._parametros_planos()
+        paso = 1.0
+        for _ in range(30):
+            self._asignar_parametros(theta + paso * direccion)
+            nueva_evaluacion = self._evaluar_objetivo(datos, y_encoded)
+            if nueva_evaluacion[0] <= cost + 1e-4 * paso * pendiente:
+                break
+            paso *= 0.5
+        else:
+            # sin progreso posible: se conserva el punto actual
+            self._asignar_parametros(theta)
+            self._convergido = True
+            return cost
+            
+        # actualizar historial de curvatura de lbfgs
+        s_k = paso * direccion
+        y_k = nueva_evaluacion[1] - gradiente
+        if self.solver == 'lbfgs' and np.dot(s_k, y_k) > 1e-10:
+            self._historial_s.append(s_k)
+            self._historial_y.append(y_k)
+            if len(self._historial_s) > memoria:
+                self._historial_s.pop(0)
+                self._historial_y.pop(0)
+                
+        self._evaluacion_actual = nueva_evaluacion
+        return cost
+        
+    def _forward(self, X):
+        """calcula probabilidades con una sola pasada del modelo"""
         if not self.is_fitted:
             raise ValueError("modelo no entrenado. ejecuta fit() primero")
             
-        X = np.array(X, dtype=np.float64)
+        X = np.asarray(X, dtype=np.float64)
         z = np.dot(X, self.weights) + self.bias
         return self._softmax(z)
         
+    def predict(self, X):
+        """predice clases"""
+        return self.predict_with_proba(X)[0]
+        
+    def predict_proba(self, X):
+        """predice probabilidades"""
+        return self._forward(X)
+        
+    def predict_with_proba(self, X):
+        """predice clases y probabilidades con una sola pasada"""
+        probabilities = self._forward(X)
+        
+        # retornar clase con mayor probabilidad
+        predictions = np.take(self.classes, np.argmax(probabilities, axis=1))
+        return predictions, probabilities
+        
     def get_feature_importance(self):
         """calcula importancia de caracteristicas"""
         if not self.is_fitted:
@@ -155,28 +544,51 @@ class ClasificadorEstudiante:
             
         return feature_importance
         
-    def save_model(self, filepath):
-        """guarda el modelo"""
+    def to_artifact(self):
+        """arreglos y metadatos del modelo para el formato binario (sin historial)"""
         if not self.is_fitted:
             raise ValueError("modelo no entrenado")
             
-        model_data = {
+        arreglos = {
             'weights': self.weights,
-            'bias': self.bias,
-            'classes': self.classes,
-            'feature_names': self.feature_names,
-            'learning_rate': self.learning_rate,
-            'max_iterations': self.max_iterations,
-            'regularization': self.regularization,
-            'training_history': self.training_history
+            'bias': self.bias
         }
+        metadatos = {
+            'classes': [c.item() if hasattr(c, 'item') else c for c in self.classes],
+            'feature_names': list(self.feature_names) if self.feature_names is not None else None,
+            'parametros': self.get_params(),
+            'n_iter': int(self.n_iter_),
+            'costo_final': float(self.training_history[-1]) if self.training_history else None
+        }
+        return arreglos, metadatos
         
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        with open(filepath, 'wb') as f:
-            pickle.dump(model_data, f)
+    def from_artifact(self, arreglos, metadatos):
+        """restaura el modelo desde arreglos y metadatos del formato binario"""
+        parametros = metadatos.get('parametros', {})
+        for nombre, valor in self.get_params().items():
+            setattr(self, nombre, parametros.get(nombre, valor))
             
-    def load_model(self, filepath):
-        """carga el modelo"""
+        self.weights = arreglos['weights']
+        self.bias = arreglos['bias']
+        self.classes = np.array(metadatos['classes'])
+        self.feature_names = metadatos.get('feature_names')
+        self.n_iter_ = metadatos.get('n_iter', 0)
+        self.training_history = []
+        self.is_fitted = True
+        
+    def save_model(self, filepath):
+        """guarda el modelo en el formato binario versionado"""
+        arreglos, metadatos = self.to_artifact()
+        return guardar_artefacto(filepath, arreglos, metadatos)
+            
+    def load_model(self, filepath, mmap=True):
+        """carga el modelo; acepta el formato binario o el pickle anterior"""
+        if es_artefacto(filepath):
+            arreglos, metadatos, _ = cargar_artefacto(filepath, mmap=mmap)
+            self.from_artifact(arreglos, metadatos)
+            return
+            
+        # formato anterior (pickle), se mantiene para migrar modelos existentes
         with open(filepath, 'rb') as f:
             model_data = pickle.load(f)
             
@@ -187,9 +599,62 @@ class ClasificadorEstudiante:
         self.learning_rate = model_data['learning_rate']
         self.max_iterations = model_data['max_iterations']
         self.regularization = model_data['regularization']
+        self.solver = model_data.get('solver', 'gd')
+        self.batch_size = model_data.get('batch_size')
+        self.momentum = model_data.get('momentum', 0.9)
+        self.tol = model_data.get('tol', 1e-5)
+        self.n_iter_no_change = model_data.get('n_iter_no_change', 10)
+        self.early_stopping = model_data.get('early_stopping', False)
+        self.validation_fraction = model_data.get('validation_fraction', 0.1)
         self.training_history = model_data.get('training_history', [])
+        self.n_iter_ = model_data.get('n_iter', len(self.training_history))
         self.is_fitted = True
         
+    @staticmethod
+    def _validar_parametros(learning_rate, max_iterations, regularization, batch_size, momentum,
+                            tol, n_iter_no_change, early_stopping, validation_fraction, warm_start):
+        """tipos y rangos de los hiperparametros (ValueError con el primero invalido)"""
+        def es_real(valor):
+            return isinstance(valor, numbers.Real) and not isinstance(valor, bool) and np.isfinite(valor)
+            
+        def es_entero(valor):
+            return isinstance(valor, numbers.Integral) and not isinstance(valor, bool)
+            
+        reglas = [
+            ('learning_rate', learning_rate, es_real(learning_rate) and learning_rate > 0, 'un numero > 0'),
+            ('max_iterations', max_iterations, es_entero(max_iterations) and max_iterations >= 1, 'un entero >= 1'),
+            ('regularization', regularization, es_real(regularization) and regularization >= 0, 'un numero >= 0'),
+            ('batch_size', batch_size, batch_size is None or (es_entero(batch_size) and batch_size >= 1),
+             'null o un entero >= 1'),
+            ('momentum', momentum, es_real(momentum) and 0 <= momentum < 1, 'un numero en [0, 1)'),
+            ('tol', tol, tol is None or (es_real(tol) and tol >= 0), 'null o un numero >= 0'),
+            ('n_iter_no_change', n_iter_no_change, es_entero(n_iter_no_change) and n_iter_no_change >= 1,
+             'un entero >= 1'),
+            ('early_stopping', early_stopping, isinstance(early_stopping, bool), 'true o false'),
+            ('validation_fraction', validation_fraction,
+             es_real(validation_fraction) and 0 < validation_fraction < 1, 'un numero en (0, 1)'),
+            ('warm_start', warm_start, isinstance(warm_start, bool), 'true o false'),
+        ]
+        for nombre, valor, valido, esperado in reglas:
+            if not valido:
+                raise ValueError(f"{nombre} debe ser {esperado} (recibido: {valor!r})")
+                
+    def get_params(self):
+        """retorna hiperparametros para crear un modelo equivalente"""
+        return {
+            'learning_rate': self.learning_rate,
+            'max_iterations': self.max_iterations,
+            'regularization': self.regularization,
+            'solver': self.solver,
+            'batch_size': self.batch_size,
+            'momentum': self.momentum,
+            'tol': self.tol,
+            'n_iter_no_change': self.n_iter_no_change,
+            'early_stopping': self.early_stopping,
+            'validation_fraction': self.validation_fraction,
+            'warm_start': self.warm_start
+        }
+        
     def get_model_info(self):
         """retorna informacion del modelo"""
         return {
@@ -197,10 +662,7 @@ class ClasificadorEstudiante:
             'autor': 'Implementacion Propia',
             'caracteristicas': len(self.feature_names) if self.feature_names else 0,
             'clases': list(self.classes) if self.classes is not None else [],
-            'parametros': {
-                'learning_rate': self.learning_rate,
-                'max_iterations': self.max_iterations,
-                'regularization': self.regularization
-            },
+            'parametros': self.get_params(),
+            'iteraciones_ejecutadas': int(self.n_iter_),
             'entrenado': self.is_fitted
         }
\ No newline at end of file
@@ -5,9 +5,19 @@ modulo principal para entrenamiento del modelo studentguard
 
 import numpy as np
 import pandas as pd
+import hashlib
 import os
 from .clasificador_estudiante import ClasificadorEstudiante
 from .evaluador import EvaluadorModelo
+from .procesador_datos import cargar_datos_binarios
+from .artefacto import guardar_artefacto, cargar_artefacto, FORMATO_VERSION
+from .servicio import ModeloServicio
+from .registro import RegistroModelos, DIRECTORIO_REGISTRO, ARCHIVO_MODELO, ARCHIVO_MODELO_PLEGADO, candado_archivo
+from .transformador import TransformadorPreprocesamiento
+
+
+# candado (en ruta_base) de la migracion de los pickles anteriores al artefacto binario
+ARCHIVO_CANDADO_MIGRACION = 'migracion.lock'
 
 
 class EntrenadorModelo:
@@ -27,10 +37,48 @@ class EntrenadorModelo:
         self.y_train = None
         self.y_test = None
         self.scaler_stats = None
+        # preprocesamiento ajustado (limpieza + escalado) que se guarda con el modelo
+        self.transformador = None
         self.entrenado = False
+        # huella de los datos usados en preparar_datos (se registra con cada version)
+        self.huella_datos = None
+        # modelo anterior con su propio escalado, punto de partida para warm_start
+        self._modelo_previo = None
+        # evaluacion calculada una vez por version del modelo: {'huella': ..., 'resultado': ...}
+        self._cache_evaluacion = None
+        # instantanea de servicio del modelo actual: {'estado': ..., 'servicio': ...}
+        self._cache_instantanea = None
         
-    def preparar_datos(self, datos_limpios):
-        """prepara datos para entrenamiento"""
+    def _estado_instantanea(self):
+        """
+        huella sin hashear de lo que entra en la instantanea: fit y cargar_modelo
+        reemplazan los arreglos del modelo y del escalado (se comparan por identidad)
+        y n_iter_ cambia con cada actualizacion en el lugar durante fit
+        """
+        scaler = self.scaler_stats or {}
+        return (self.modelo, self.modelo.weights, self.modelo.bias, self.modelo.n_iter_,
+                scaler.get('mean'), scaler.get('std'), self.transformador)
+        
+    def huella_modelo(self):
+        """identificador de la version del modelo (parametros, clases y escalado)"""
+        if self.modelo is None or not self.modelo.is_fitted:
+            return None
+            
+        h = hashlib.sha256()
+        h.update(np.ascontiguousarray(self.modelo.weights).tobytes())
+        h.update(np.ascontiguousarray(self.modelo.bias).tobytes())
+        h.update(repr([str(c) for c in self.modelo.classes]).encode())
+        if self.scaler_stats:
+            h.update(np.ascontiguousarray(self.scaler_stats['mean'], dtype=np.float64).tobytes())
+            h.update(np.ascontiguousarray(self.scaler_stats['std'], dtype=np.float64).tobytes())
+        return h.hexdigest()
+        
+    def preparar_datos(self, datos_limpios, dtype=np.float64, ruta_buffer=None, estadisticas_limpieza=None):
+        """
+        prepara datos para entrenamiento
+        estadisticas_limpieza (ProcesadorDatos.estadisticas_limpieza) se guardan
+        con el modelo para aplicar la misma limpieza al predecir
+        """
         if 'riesgo' not in datos_limpios.columns:
             raise ValueError("columna riesgo no encontrada")
             
@@ -38,11 +86,29 @@ class EntrenadorModelo:
         X = datos_limpios.drop('riesgo', axis=1)
         y = datos_limpios['riesgo']
         
+        return self._preparar_matrices(X.to_numpy(), np.asarray(y), X.columns.tolist(), dtype, ruta_buffer,
+                                       estadisticas_limpieza=estadisticas_limpieza)
+        
+    def preparar_datos_binarios(self, ruta_base, dtype=np.float64, ruta_buffer=None):
+        """prepara datos desde el formato binario de ProcesadorDatos, mapeando X en memoria"""
+        datos = cargar_datos_binarios(ruta_base, mmap=True)
+        return self._preparar_matrices(datos['X'], datos['y'], datos['columnas'], dtype, ruta_buffer,
+                                       estadisticas_limpieza=datos['esquema'].get('limpieza'))
+        
+    def _preparar_matrices(self, X, y, features, dtype=np.float64, ruta_buffer=None, filas_bloque=65536,
+                           estadisticas_limpieza=None):
+        """
+        divide train/test y estandariza a partir de una matriz de caracteristicas
+        las filas barajadas se copian por bloques a un unico buffer (en ram, o
+        np.memmap en ruta_buffer) de tipo dtype; X_train y X_test son vistas de
+        ese buffer y la estandarizacion se aplica sobre el mismo
+        """
         # verificar distribucion de clases
-        distribucion = y.value_counts()
-        if len(distribucion) < 2:
+        if len(np.unique(y)) < 2:
             raise ValueError("se necesitan al menos 2 clases diferentes")
             
+        self.huella_datos = self._calcular_huella_datos(X, y, features, filas_bloque)
+            
         # dividir train/test (80/20)
         np.random.seed(42)
         n_samples = len(X)
@@ -52,39 +118,92 @@ class EntrenadorModelo:
         train_idx = indices[:split_idx]
         test_idx = indices[split_idx:]
         
-        self.X_train = X.iloc[train_idx].values
-        self.X_test = X.iloc[test_idx].values
-        self.y_train = y.iloc[train_idx].values
-        self.y_test = y.iloc[test_idx].values
+        # el escalado va a cambiar: conservar el modelo actual (con el suyo) para warm_start
+        self._modelo_previo = self.instantanea() if self.entrenado else None
+        
+        # liberar el buffer anterior antes de crear (o reescribir) el nuevo
+        self.X_train = self.X_test = None
+        
+        # un solo buffer: filas de entrenamiento primero, prueba despues
+        forma = (n_samples, X.shape[1])
+        if ruta_buffer:
+            buffer = np.memmap(ruta_buffer, dtype=dtype, mode='w+', shape=forma)
+            # el mapeo mantiene los datos: se quita el archivo para que el espacio se
+            # libere junto con el buffer (en windows no se puede borrar; queda en disco)
+            try:
+                os.remove(ruta_buffer)
+            except OSError:
+                pass
+        else:
+            buffer = np.empty(forma, dtype=dtype)
+        for inicio in range(0, n_samples, filas_bloque):
+            buffer[inicio:inicio + filas_bloque] = X[indices[inicio:inicio + filas_bloque]]
+            
+        self.X_train = buffer[:split_idx]
+        self.X_test = buffer[split_idx:]
+        self.y_train = y[train_idx]
+        self.y_test = y[test_idx]
         
         # estandarizar datos
-        self._estandarizar_datos()
+        self._estandarizar_datos(filas_bloque)
+        self.transformador = TransformadorPreprocesamiento.desde_estadisticas(
+            estadisticas_limpieza, features, self.scaler_stats['mean'], self.scaler_stats['std']
+        )
+        
+        # el conjunto de prueba cambio: la evaluacion anterior ya no aplica
+        self._cache_evaluacion = None
         
         return {
             'train_samples': int(len(self.X_train)),
             'test_samples': int(len(self.X_test)),
-            'features': X.columns.tolist(),
+            'features': list(features),
+            'dtype': np.dtype(dtype).name,
             'distribucion_train': {k: int(v) for k, v in pd.Series(self.y_train).value_counts().items()},
             'distribucion_test': {k: int(v) for k, v in pd.Series(self.y_test).value_counts().items()}
         }
         
-    def _estandarizar_datos(self):
-        """estandariza caracteristicas"""
-        # calcular media y std del conjunto de entrenamiento
+    @staticmethod
+    def _calcular_huella_datos(X, y, features, filas_bloque=65536):
+        """sha256 de columnas, valores (en float64, por bloques) y etiquetas"""
+        h = hashlib.sha256()
+        h.update(repr(list(features)).encode())
+        for inicio in range(0, len(X), filas_bloque):
+            h.update(np.ascontiguousarray(X[inicio:inicio + filas_bloque], dtype=np.float64).tobytes())
+        h.update(np.asarray(y, dtype=str).tobytes())
+        return h.hexdigest()
+        
+    def _estandarizar_datos(self, filas_bloque=65536):
+        """estandariza caracteristicas en el mismo buffer (sin copias completas)"""
+        # calcular media y std del conjunto de entrenamiento (en float64)
+        mean = np.mean(self.X_train, axis=0, dtype=np.float64)
+        suma_cuadrados = np.zeros_like(mean)
+        for inicio in range(0, len(self.X_train), filas_bloque):
+            diferencia = self.X_train[inicio:inicio + filas_bloque] - mean
+            suma_cuadrados += np.sum(diferencia * diferencia, axis=0)
+        std = np.sqrt(suma_cuadrados / max(len(self.X_train), 1))
+        
         self.scaler_stats = {
-            'mean': np.mean(self.X_train, axis=0),
-            'std': np.std(self.X_train, axis=0)
+            'mean': mean,
+            'std': std
         }
         
         # evitar division por cero
         self.scaler_stats['std'] = np.where(self.scaler_stats['std'] == 0, 1, self.scaler_stats['std'])
         
-        # aplicar estandarizacion
-        self.X_train = (self.X_train - self.scaler_stats['mean']) / self.scaler_stats['std']
-        self.X_test = (self.X_test - self.scaler_stats['mean']) / self.scaler_stats['std']
-        
-    def entrenar(self, learning_rate=0.01, max_iterations=1000, regularization=0.01):
-        """entrena el modelo studentguard"""
+        # aplicar estandarizacion en sitio
+        for matriz in (self.X_train, self.X_test):
+            matriz -= self.scaler_stats['mean'].astype(matriz.dtype)
+            matriz /= self.scaler_stats['std'].astype(matriz.dtype)
+            
+    def entrenar(self, learning_rate=0.01, max_iterations=1000, regularization=0.01,
+                 callback=None, inicial=None, **opciones):
+        """
+        entrena el modelo studentguard
+        opciones adicionales (solver, batch_size, tol, early_stopping, ...) se pasan
+        directamente a ClasificadorEstudiante; callback recibe (iteracion, costo)
+        con warm_start=True parte del modelo 'inicial' (ModeloServicio) o, si no se
+        indica, del modelo que tenia este entrenador antes de preparar_datos
+        """
         if self.X_train is None:
             raise ValueError("preparar datos primero")
             
@@ -92,30 +211,53 @@ class EntrenadorModelo:
         self.modelo = ClasificadorEstudiante(
             learning_rate=learning_rate,
             max_iterations=max_iterations,
-            regularization=regularization
+            regularization=regularization,
+            **opciones
         )
         
+        if opciones.get('warm_start'):
+            inicial = inicial or self._modelo_previo
+            iniciales = self._pesos_reescalados(inicial) if inicial is not None else None
+            if iniciales is not None:
+                self.modelo.set_initial_params(*iniciales, inicial.modelo.classes)
+                print("warm start desde el modelo anterior")
+            elif inicial is not None:
+                print("warm start: cambiaron las caracteristicas o las clases, se inicia desde cero")
+            
         # entrenar
         print("iniciando entrenamiento del modelo studentguard...")
-        self.modelo.fit(self.X_train, self.y_train)
+        self.modelo.fit(self.X_train, self.y_train, callback=callback)
         
         self.entrenado = True
+        self._cache_evaluacion = None
         print("entrenamiento completado!")
         
         return self.modelo.get_model_info()
         
-    def evaluar(self):
-        """evalua el modelo entrenado"""
+    def evaluar(self, n_jobs=None, backend='thread', forzar=False, cv_warm_start=None):
+        """
+        evalua el modelo entrenado (n_jobs / backend controlan la validacion cruzada paralela)
+        el resultado se guarda por huella del modelo; solo entrenar, cargar_modelo
+        o preparar_datos lo invalidan, salvo que se pida forzar=True
+        cv_warm_start=True: los folds de la validacion cruzada parten del modelo
+        entrenado; None reutiliza la ultima evaluacion sin importar el modo
+        """
         if not self.entrenado:
             raise ValueError("modelo no entrenado")
             
+        huella = self.huella_modelo()
+        cache = self._cache_evaluacion
+        if (not forzar and cache is not None and cache['huella'] == huella
+                and cv_warm_start in (None, cache['resultado']['validacion_cruzada']['warm_start'])):
+            return cache['resultado']
+        cv_warm_start = bool(cv_warm_start)
+            
         # predicciones en conjunto de prueba
-        y_pred = self.modelo.predict(self.X_test)
-        y_proba = self.modelo.predict_proba(self.X_test)
+        y_pred, y_proba = self.modelo.predict_with_proba(self.X_test)
         
         # crear evaluador
         self.evaluador = EvaluadorModelo()
-        self.evaluador.set_predictions(self.y_test, y_pred, y_proba)
+        self.evaluador.set_predictions(self.y_test, y_pred, y_proba, proba_classes=self.modelo.classes)
         
         # obtener metricas
         metricas = self.evaluador.obtener_resumen_metricas()
@@ -123,45 +265,174 @@ class EntrenadorModelo:
         
         # validacion cruzada en datos de entrenamiento
         cv_scores = self.evaluador.cross_validation_score(
-            self.modelo, self.X_train, self.y_train, cv=5
+            self.modelo, self.X_train, self.y_train, cv=5, n_jobs=n_jobs, backend=backend,
+            warm_start=cv_warm_start
         )
         
-        return {
+        resultado = {
             'metricas_principales': metricas,
             'reporte_completo': reporte_completo,
             'validacion_cruzada': {
                 'scores': cv_scores,
                 'mean': float(np.mean(cv_scores)),
-                'std': float(np.std(cv_scores))
+                'std': float(np.std(cv_scores)),
+                'warm_start': cv_warm_start
             },
-            'importancia_caracteristicas': self.modelo.get_feature_importance()
+            'importancia_caracteristicas': self.modelo.get_feature_importance(),
+            'huella_modelo': huella
         }
         
-    def guardar_modelo(self, ruta_base):
-        """guarda el modelo y scaler"""
+        self._cache_evaluacion = {'huella': huella, 'resultado': resultado}
+        return resultado
+        
+    def _pesos_reescalados(self, inicial):
+        """
+        pesos de 'inicial' expresados para el escalado actual: el modelo calcula
+        ((x - m0) / s0) W0 + b0, que con el escalado nuevo (m1, s1) equivale a
+        W1 = diag(s1 / s0) W0 y b1 = b0 + ((m1 - m0) / s0) W0
+        retorna None si 'inicial' no sirve de punto de partida: otra cantidad de
+        caracteristicas (p.ej. actividades como indicadores) u otras clases
+        """
+        weights = np.asarray(inicial.modelo.weights, dtype=np.float64)
+        bias = np.asarray(inicial.modelo.bias, dtype=np.float64).reshape(1, -1)
+        clases = [str(c) for c in np.unique(self.y_train)]
+        if weights.shape[0] != self.X_train.shape[1] or [str(c) for c in inicial.modelo.classes] != clases:
+            return None
+        if inicial.scaler_mean is None or not self.scaler_stats or len(inicial.scaler_mean) != len(weights):
+            return weights, bias
+        m0, s0 = inicial.scaler_mean, inicial.scaler_std
+        m1, s1 = self.scaler_stats['mean'], self.scaler_stats['std']
+        return weights * (s1 / s0)[:, None], bias + np.dot((m1 - m0) / s0, weights)
+        
+    def guardar_modelo(self, ruta_base, registro=None, promover=True):
+        """
+        guarda el modelo como nueva version en el registro (data/registro) con sus
+        hiperparametros, metricas y huella de datos; si promover=True tambien queda
+        como modelo actual en ruta_base (el que se carga al iniciar)
+        """
         if not self.entrenado:
             raise ValueError("modelo no entrenado")
             
         # crear directorio
         os.makedirs(ruta_base, exist_ok=True)
+        if registro is None:
+            registro = RegistroModelos(os.path.join(ruta_base, DIRECTORIO_REGISTRO))
         
-        # guardar modelo
-        modelo_path = os.path.join(ruta_base, 'modelo_studentguard.pkl')
-        self.modelo.save_model(modelo_path)
+        # pesos, sesgo y estadisticas del scaler juntos: nunca quedan desincronizados
+        arreglos, metadatos = self._artefacto()
+        evaluacion = self._cache_evaluacion['resultado'] if self._cache_evaluacion else None
+        info = registro.registrar(arreglos, metadatos, {
+            'hiperparametros': self.modelo.get_params(),
+            'iteraciones': int(self.modelo.n_iter_),
+            'metricas': evaluacion['metricas_principales'] if evaluacion else None,
+            'huella_datos': self.huella_datos,
+            'huella_modelo': self.huella_modelo()
+        })
         
-        # guardar estadisticas del scaler
-        scaler_path = os.path.join(ruta_base, 'scaler_stats.pkl')
-        import pickle
-        with open(scaler_path, 'wb') as f:
-            pickle.dump(self.scaler_stats, f)
+        modelo_path = os.path.join(ruta_base, ARCHIVO_MODELO)
+        if promover:
+            registro.promover(info['version'], ruta_actual=modelo_path)
+        
+        return {
+            'modelo_path': modelo_path if promover else os.path.join(registro.directorio, info['archivo']),
+            'formato_version': FORMATO_VERSION,
+            'checksum': info['checksum'],
+            'version': info['version'],
+            'promovida': bool(promover)
+        }
+        
+    def _artefacto(self, plegado=False):
+        """
+        arreglos y metadatos del modelo junto con el scaler y el preprocesamiento
+        plegado=True incluye la estandarizacion en pesos y sesgo y omite el scaler
+        """
+        arreglos, metadatos = self.modelo.to_artifact()
+        transformador = self.transformador
+        if plegado and self.scaler_stats:
+            if transformador is None:
+                transformador = TransformadorPreprocesamiento.desde_dict(
+                    None, self.scaler_stats['mean'], self.scaler_stats['std']
+                )
+            arreglos['weights'], arreglos['bias'], transformador = transformador.plegar(
+                arreglos['weights'], arreglos['bias']
+            )
+            metadatos['plegado'] = True
+        elif self.scaler_stats:
+            arreglos['scaler_mean'] = np.asarray(self.scaler_stats['mean'], dtype=np.float64)
+            arreglos['scaler_std'] = np.asarray(self.scaler_stats['std'], dtype=np.float64)
+        if transformador is not None:
+            metadatos['preprocesamiento'] = transformador.a_dict()
+        return arreglos, metadatos
+        
+    def exportar_modelo_plegado(self, ruta_base):
+        """
+        exporta el modelo con el escalado plegado en los pesos (ARCHIVO_MODELO_PLEGADO):
+        para servir predicciones basta una transformacion afin mas softmax
+        """
+        if not self.entrenado:
+            raise ValueError("modelo no entrenado")
             
+        modelo_path = os.path.join(ruta_base, ARCHIVO_MODELO_PLEGADO)
+        checksum = guardar_artefacto(modelo_path, *self._artefacto(plegado=True))
         return {
             'modelo_path': modelo_path,
-            'scaler_path': scaler_path
+            'formato_version': FORMATO_VERSION,
+            'checksum': checksum,
+            'plegado': True
         }
         
+    def instantanea(self):
+        """
+        copia inmutable del modelo actual para servir predicciones; se construye
+        una vez por version del modelo
+        """
+        if not self.entrenado:
+            raise ValueError("modelo no entrenado")
+            
+        estado = self._estado_instantanea()
+        cache = self._cache_instantanea
+        if cache is None or any(a is not b for a, b in zip(cache['estado'], estado)):
+            cache = {'estado': estado, 'servicio': ModeloServicio(*self._artefacto())}
+            self._cache_instantanea = cache
+        return cache['servicio']
+        
     def cargar_modelo(self, ruta_base):
-        """carga modelo y scaler guardados"""
+        """
+        carga modelo y scaler guardados (artefacto binario o pickles anteriores)
+        la migracion de los pickles toma un candado entre procesos y se hace una
+        sola vez: quien espera el candado encuentra el artefacto ya escrito
+        """
+        modelo_path = os.path.join(ruta_base, ARCHIVO_MODELO)
+        
+        migrado = False
+        if not os.path.exists(modelo_path):
+            if not os.path.exists(os.path.join(ruta_base, 'modelo_studentguard.pkl')):
+                raise ValueError("modelo no encontrado")
+            with candado_archivo(os.path.join(ruta_base, ARCHIVO_CANDADO_MIGRACION)):
+                if not os.path.exists(modelo_path):
+                    self._cargar_modelo_pickle(ruta_base)
+                    migrado = True
+                    
+        if not migrado:
+            # sin mmap: promover y guardar reemplazan este archivo con os.replace,
+            # y windows no reemplaza un archivo mapeado
+            arreglos, metadatos, _ = cargar_artefacto(modelo_path, mmap=False)
+            self.modelo = ClasificadorEstudiante()
+            self.modelo.from_artifact(arreglos, metadatos)
+            self.scaler_stats = None
+            if 'scaler_mean' in arreglos:
+                self.scaler_stats = {'mean': arreglos['scaler_mean'], 'std': arreglos['scaler_std']}
+            scaler = self.scaler_stats or {}
+            self.transformador = TransformadorPreprocesamiento.desde_dict(
+                metadatos.get('preprocesamiento'), scaler.get('mean'), scaler.get('std')
+            )
+            
+        self.huella_datos = None
+        self.entrenado = True
+        self._cache_evaluacion = None
+        
+    def _cargar_modelo_pickle(self, ruta_base):
+        """migracion: carga los pickles anteriores y los reescribe como artefacto binario"""
         modelo_path = os.path.join(ruta_base, 'modelo_studentguard.pkl')
         scaler_path = os.path.join(ruta_base, 'scaler_stats.pkl')
         
@@ -173,36 +444,15 @@ class EntrenadorModelo:
         self.modelo.load_model(modelo_path)
         
         # cargar scaler
+        self.scaler_stats = None
         if os.path.exists(scaler_path):
             import pickle
             with open(scaler_path, 'rb') as f:
                 self.scaler_stats = pickle.load(f)
                 
+        # la proxima carga ya usa el formato nuevo
         self.entrenado = True
-        
-    def predecir(self, datos_estudiante):
-        """predice riesgo para un estudiante individual"""
-        if not self.entrenado:
-            raise ValueError("modelo no entrenado")
-            
-        # convertir a array
-        X = np.array([datos_estudiante])
-        
-        # aplicar mismo escalado que en entrenamiento
-        if self.scaler_stats:
-            X = (X - self.scaler_stats['mean']) / self.scaler_stats['std']
-            
-        # predecir
-        prediccion = self.modelo.predict(X)[0]
-        probabilidades = self.modelo.predict_proba(X)[0]
-        
-        # mapear probabilidades a clases
-        prob_dict = {}
-        for i, clase in enumerate(self.modelo.classes):
-            prob_dict[clase] = float(probabilidades[i])
-            
-        return {
-            'riesgo': prediccion,
-            'probabilidades': prob_dict,
-            'confianza': float(max(probabilidades))
-        }
\ No newline at end of file
+        try:
+            self.guardar_modelo(ruta_base)
+        except OSError:
+            pass
@@ -4,129 +4,187 @@ modulo para evaluacion de metricas de rendimiento del modelo
 """
 
 import numpy as np
+import os
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
 
 
 class EvaluadorModelo:
     """evaluador de metricas para clasificacion"""
     
+    # promedios soportados por precision, recall y f1_score
+    PROMEDIOS = ('weighted', 'macro', 'micro')
+    
     def __init__(self):
         self.y_true = None
         self.y_pred = None
         self.y_proba = None
         self.classes = None
+        # etiquetas codificadas como indices de self.classes
+        self.y_true_idx = None
+        self.y_pred_idx = None
+        # conteos por clase derivados de la matriz de confusion
+        self._cm = None
+        self._tp = None
+        self._fp = None
+        self._fn = None
+        self._support = None
+        self._roc_auc = None
         
-    def set_predictions(self, y_true, y_pred, y_proba=None):
-        """establece predicciones para evaluacion"""
+    def set_predictions(self, y_true, y_pred, y_proba=None, proba_classes=None):
+        """
+        establece predicciones para evaluacion
+        proba_classes indica la clase de cada columna de y_proba (por defecto self.classes)
+        """
         self.y_true = np.array(y_true)
         self.y_pred = np.array(y_pred)
         self.y_proba = y_proba
-        self.classes = np.unique(np.concatenate([self.y_true, self.y_pred]))
         
-    def accuracy(self):
-        """calcula exactitud"""
-        if self.y_true is None or self.y_pred is None:
-            raise ValueError("establecer predicciones primero")
-            
-        correct = np.sum(self.y_true == self.y_pred)
-        total = len(self.y_true)
-        return correct / total
+        # codificar ambas series a enteros una sola vez
+        self.classes, indices = np.unique(np.concatenate([self.y_true, self.y_pred]), return_inverse=True)
+        indices = indices.ravel()
+        self.y_true_idx = indices[:len(self.y_true)]
+        self.y_pred_idx = indices[len(self.y_true):]
         
-    def precision(self, average='weighted'):
-        """calcula precision"""
+        # una sola matriz de confusion alimenta todas las metricas
+        n_classes = len(self.classes)
+        self._cm = np.bincount(
+            self.y_true_idx * n_classes + self.y_pred_idx,
+            minlength=n_classes * n_classes
+        ).reshape(n_classes, n_classes)
+        self._tp = np.diag(self._cm)
+        self._support = self._cm.sum(axis=1)
+        self._fp = self._cm.sum(axis=0) - self._tp
+        self._fn = self._support - self._tp
+        
+        self._roc_auc = self._calcular_roc_auc(proba_classes) if y_proba is not None else None
+        
+    def _verificar_predicciones(self):
         if self.y_true is None or self.y_pred is None:
             raise ValueError("establecer predicciones primero")
             
+    @staticmethod
+    def _dividir(numerador, denominador):
+        """division elemento a elemento que retorna 0 cuando el denominador es 0"""
+        numerador = np.asarray(numerador, dtype=np.float64)
+        denominador = np.asarray(denominador, dtype=np.float64)
+        return np.divide(numerador, denominador, out=np.zeros_like(numerador), where=denominador > 0)
+        
+    def _promediar(self, valores, tp_total, denominador_total, average):
+        """combina metricas por clase segun el tipo de promedio"""
         if average == 'weighted':
-            precisions = []
-            weights = []
-            
-            for cls in self.classes:
-                # verdaderos positivos
-                tp = np.sum((self.y_true == cls) & (self.y_pred == cls))
-                # falsos positivos
-                fp = np.sum((self.y_true != cls) & (self.y_pred == cls))
-                
-                if tp + fp == 0:
-                    precision_cls = 0.0
-                else:
-                    precision_cls = tp / (tp + fp)
-                    
-                precisions.append(precision_cls)
-                weights.append(np.sum(self.y_true == cls))
-                
-            # promedio ponderado
-            total_weight = sum(weights)
+            total_weight = self._support.sum()
             if total_weight == 0:
                 return 0.0
-                
-            weighted_precision = sum(p * w for p, w in zip(precisions, weights)) / total_weight
-            return weighted_precision
-            
-        return 0.0
+            return float(np.dot(valores, self._support) / total_weight)
+        if average == 'macro':
+            return float(np.mean(valores)) if len(valores) else 0.0
+        if average == 'micro':
+            return float(self._dividir(tp_total, denominador_total))
+        raise ValueError(f"promedio desconocido: {average}. opciones: {list(self.PROMEDIOS)}")
+        
+    def accuracy(self):
+        """calcula exactitud"""
+        self._verificar_predicciones()
+        return float(self._tp.sum() / len(self.y_true))
+        
+    def precision_por_clase(self):
+        """precision de cada clase en el orden de self.classes"""
+        self._verificar_predicciones()
+        return self._dividir(self._tp, self._tp + self._fp)
+        
+    def recall_por_clase(self):
+        """recall de cada clase en el orden de self.classes"""
+        self._verificar_predicciones()
+        return self._dividir(self._tp, self._tp + self._fn)
+        
+    def precision(self, average='weighted'):
+        """calcula precision (weighted, macro o micro)"""
+        precisiones = self.precision_por_clase()
+        tp = self._tp.sum()
+        return self._promediar(precisiones, tp, tp + self._fp.sum(), average)
         
     def recall(self, average='weighted'):
-        """calcula recall"""
-        if self.y_true is None or self.y_pred is None:
-            raise ValueError("establecer predicciones primero")
-            
-        if average == 'weighted':
-            recalls = []
-            weights = []
-            
-            for cls in self.classes:
-                # verdaderos positivos
-                tp = np.sum((self.y_true == cls) & (self.y_pred == cls))
-                # falsos negativos
-                fn = np.sum((self.y_true == cls) & (self.y_pred != cls))
-                
-                if tp + fn == 0:
-                    recall_cls = 0.0
-                else:
-                    recall_cls = tp / (tp + fn)
-                    
-                recalls.append(recall_cls)
-                weights.append(np.sum(self.y_true == cls))
-                
-            # promedio ponderado
-            total_weight = sum(weights)
-            if total_weight == 0:
-                return 0.0
-                
-            weighted_recall = sum(r * w for r, w in zip(recalls, weights)) / total_weight
-            return weighted_recall
-            
-        return 0.0
+        """calcula recall (weighted, macro o micro)"""
+        recalls = self.recall_por_clase()
+        tp = self._tp.sum()
+        return self._promediar(recalls, tp, tp + self._fn.sum(), average)
         
-    def f1_score(self, average='weighted'):
-        """calcula f1-score"""
-        prec = self.precision(average)
-        rec = self.recall(average)
+    def f1_por_clase(self):
+        """f1 de cada clase en el orden de self.classes: 2 tp / (2 tp + fp + fn)"""
+        self._verificar_predicciones()
+        return self._dividir(2 * self._tp, 2 * self._tp + self._fp + self._fn)
         
-        if prec + rec == 0:
-            return 0.0
-            
-        return 2 * (prec * rec) / (prec + rec)
+    def f1_score(self, average='weighted'):
+        """
+        calcula f1-score: macro y weighted promedian el f1 de cada clase;
+        micro es la media armonica de la precision y el recall globales
+        """
+        if average == 'micro':
+            self._verificar_predicciones()
+            tp = self._tp.sum()
+            return float(self._dividir(2 * tp, 2 * tp + self._fp.sum() + self._fn.sum()))
+        return self._promediar(self.f1_por_clase(), None, None, average)
         
     def confusion_matrix(self):
         """calcula matriz de confusion"""
-        if self.y_true is None or self.y_pred is None:
-            raise ValueError("establecer predicciones primero")
-            
-        # crear mapeo de clases a indices
-        class_to_idx = {cls: idx for idx, cls in enumerate(self.classes)}
-        n_classes = len(self.classes)
+        self._verificar_predicciones()
+        return self._cm.copy()
         
-        # inicializar matriz
-        cm = np.zeros((n_classes, n_classes), dtype=int)
-        
-        # llenar matriz
-        for true_cls, pred_cls in zip(self.y_true, self.y_pred):
-            true_idx = class_to_idx[true_cls]
-            pred_idx = class_to_idx[pred_cls]
-            cm[true_idx, pred_idx] += 1
+    def _calcular_roc_auc(self, proba_classes=None):
+        """
+        roc-auc uno contra el resto para cada clase usando la estadistica de
+        mann-whitney sobre rangos (los empates reciben rango promedio)
+        """
+        y_proba = np.asarray(self.y_proba, dtype=np.float64)
+        if y_proba.ndim != 2 or len(y_proba) != len(self.y_true):
+            return None
+            
+        if proba_classes is None:
+            proba_classes = self.classes
+        proba_classes = list(proba_classes)
+        if len(proba_classes) != y_proba.shape[1]:
+            return None
             
-        return cm
+        por_clase = {}
+        for idx, cls in enumerate(self.classes):
+            if cls not in proba_classes:
+                continue
+            positivos = self.y_true_idx == idx
+            n_pos = int(positivos.sum())
+            n_neg = len(positivos) - n_pos
+            if n_pos == 0 or n_neg == 0:
+                continue
+                
+            # rangos promedio (base 1) de los puntajes de esta clase
+            puntajes = y_proba[:, proba_classes.index(cls)]
+            _, inversos, conteos = np.unique(puntajes, return_inverse=True, return_counts=True)
+            rango_promedio = np.cumsum(conteos) - (conteos - 1) / 2.0
+            rangos = rango_promedio[inversos.ravel()]
+            
+            auc = (rangos[positivos].sum() - n_pos * (n_pos + 1) / 2.0) / (n_pos * n_neg)
+            por_clase[cls] = float(auc)
+            
+        if not por_clase:
+            return None
+            
+        valores = np.array(list(por_clase.values()))
+        soportes = np.array([self._support[list(self.classes).index(cls)] for cls in por_clase])
+        return {
+            'per_class': por_clase,
+            'macro': float(np.mean(valores)),
+            'weighted': float(np.dot(valores, soportes) / soportes.sum())
+        }
+        
+    def roc_auc(self, average='macro'):
+        """roc-auc uno contra el resto a partir de y_proba (None si no hay probabilidades)"""
+        self._verificar_predicciones()
+        if self._roc_auc is None:
+            return None
+        if average not in ('macro', 'weighted'):
+            raise ValueError(f"promedio desconocido: {average}. opciones: ['macro', 'weighted']")
+        return self._roc_auc[average]
         
     def classification_report(self):
         """genera reporte de clasificacion detallado"""
@@ -134,29 +192,30 @@ class EvaluadorModelo:
         
         # metricas globales
         metrics['accuracy'] = self.accuracy()
-        metrics['precision_weighted'] = self.precision('weighted')
-        metrics['recall_weighted'] = self.recall('weighted')
-        metrics['f1_score_weighted'] = self.f1_score('weighted')
+        for average in self.PROMEDIOS:
+            metrics[f'precision_{average}'] = self.precision(average)
+            metrics[f'recall_{average}'] = self.recall(average)
+            metrics[f'f1_score_{average}'] = self.f1_score(average)
+            
+        # metricas por clase, todas derivadas de la matriz de confusion
+        precisiones = self.precision_por_clase()
+        recalls = self.recall_por_clase()
+        f1s = self.f1_por_clase()
         
-        # metricas por clase
         metrics['per_class'] = {}
-        for cls in self.classes:
-            # calcular metricas para esta clase
-            tp = np.sum((self.y_true == cls) & (self.y_pred == cls))
-            fp = np.sum((self.y_true != cls) & (self.y_pred == cls))
-            fn = np.sum((self.y_true == cls) & (self.y_pred != cls))
-            
-            precision_cls = tp / (tp + fp) if (tp + fp) > 0 else 0.0
-            recall_cls = tp / (tp + fn) if (tp + fn) > 0 else 0.0
-            f1_cls = 2 * (precision_cls * recall_cls) / (precision_cls + recall_cls) if (precision_cls + recall_cls) > 0 else 0.0
-            support = np.sum(self.y_true == cls)
-            
+        for i, cls in enumerate(self.classes):
             metrics['per_class'][cls] = {
-                'precision': float(precision_cls),
-                'recall': float(recall_cls),
-                'f1_score': float(f1_cls),
-                'support': int(support)
+                'precision': float(precisiones[i]),
+                'recall': float(recalls[i]),
+                'f1_score': float(f1s[i]),
+                'support': int(self._support[i])
             }
+            if self._roc_auc is not None and cls in self._roc_auc['per_class']:
+                metrics['per_class'][cls]['roc_auc'] = self._roc_auc['per_class'][cls]
+                
+        if self._roc_auc is not None:
+            metrics['roc_auc_macro'] = self._roc_auc['macro']
+            metrics['roc_auc_weighted'] = self._roc_auc['weighted']
             
         # matriz de confusion
         metrics['confusion_matrix'] = self.confusion_matrix().tolist()
@@ -172,46 +231,124 @@ class EvaluadorModelo:
         f1 = self.f1_score('weighted')
         
         # convertir a porcentajes
-        return {
+        resumen = {
             'exactitud': float(round(accuracy * 100, 2)),
             'precision': float(round(precision * 100, 2)),
             'recall': float(round(recall * 100, 2)),
             'f1_score': float(round(f1 * 100, 2))
         }
         
-    def cross_validation_score(self, model, X, y, cv=5):
-        """validacion cruzada simple"""
-        if len(X) < cv:
-            cv = len(X)
+        if self._roc_auc is not None:
+            resumen['roc_auc'] = float(round(self._roc_auc['macro'] * 100, 2))
             
-        n_samples = len(X)
+        return resumen
+        
+    def cross_validation_score(self, model, X, y, cv=5, n_jobs=None, backend='thread', warm_start=False):
+        """
+        validacion cruzada simple
+        los folds se entrenan en paralelo con n_jobs trabajadores (None = uno por
+        nucleo, hasta cv); backend 'thread' comparte X directamente y 'process'
+        lo publica una sola vez en memoria compartida
+        warm_start=True: cada fold parte de los pesos de model (ya entrenado con
+        todos los datos) en lugar de pesos aleatorios; converge mucho antes, pero
+        el fold de validacion ya influyo en el punto de partida
+        """
+        inicial = None
+        if warm_start and model.is_fitted:
+            inicial = (np.asarray(model.weights), np.asarray(model.bias), np.asarray(model.classes))
+        return self.cross_validation_scores([model.get_params()], X, y, cv, n_jobs, backend, inicial=inicial)[0]
+        
+    def cross_validation_scores(self, lista_params, X, y, cv=5, n_jobs=None, backend='thread',
+                                n_filas=None, inicial=None):
+        """
+        validacion cruzada de varias configuraciones (listas de hiperparametros)
+        en un solo pool: todos los pares (configuracion, fold) se reparten entre
+        los trabajadores; n_filas usa solo las primeras filas de X (X ya barajada)
+        inicial: (weights, bias, classes) de partida para cada fold (warm start)
+        retorna una lista de scores por fold para cada configuracion
+        """
+        X = np.asarray(X)
+        if X.dtype not in (np.float32, np.float64) or not X.flags['C_CONTIGUOUS']:
+            X = np.ascontiguousarray(X, dtype=np.float64)
+        y = np.asarray(y)
+        n_samples = len(X) if n_filas is None else min(int(n_filas), len(X))
+        if n_samples < cv:
+            cv = n_samples
         fold_size = n_samples // cv
-        scores = []
         
+        # limites de cada fold, calculados una sola vez
+        folds = []
         for i in range(cv):
-            # dividir datos
             start_idx = i * fold_size
             end_idx = start_idx + fold_size if i < cv - 1 else n_samples
+            folds.append((start_idx, end_idx))
             
-            # crear conjuntos de validacion y entrenamiento
-            X_train = np.concatenate([X[:start_idx], X[end_idx:]])
-            y_train = np.concatenate([y[:start_idx], y[end_idx:]])
-            X_val = X[start_idx:end_idx]
-            y_val = y[start_idx:end_idx]
-            
-            # entrenar modelo temporal
-            from .clasificador_estudiante import ClasificadorEstudiante
-            temp_model = ClasificadorEstudiante(
-                learning_rate=model.learning_rate,
-                max_iterations=model.max_iterations,
-                regularization=model.regularization
-            )
-            
-            temp_model.fit(X_train, y_train)
-            y_pred = temp_model.predict(X_val)
-            
-            # calcular accuracy
-            accuracy = float(np.sum(y_val == y_pred) / len(y_val))
-            scores.append(accuracy)
+        tareas = [(params, n_samples, inicio, fin) for params in lista_params for inicio, fin in folds]
+        if n_jobs is None:
+            n_jobs = os.cpu_count() or 1
+        n_jobs = max(1, min(int(n_jobs), len(tareas)))
+        
+        if n_jobs == 1:
+            scores = [_puntuar_fold(params, X[:n], y[:n], inicio, fin, inicial) for params, n, inicio, fin in tareas]
+        elif backend == 'thread':
+            # numpy libera el gil en los productos de matrices
+            with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+                scores = list(pool.map(lambda t: _puntuar_fold(t[0], X[:t[1]], y[:t[1]], t[2], t[3], inicial), tareas))
+        elif backend == 'process':
+            shm = shared_memory.SharedMemory(create=True, size=max(1, X.nbytes))
+            try:
+                X_compartida = np.ndarray(X.shape, dtype=X.dtype, buffer=shm.buf)
+                X_compartida[:] = X
+                del X_compartida
+                with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+                    futuros = [
+                        pool.submit(_puntuar_fold_compartido, params, shm.name, (n, X.shape[1]), X.dtype.str, y[:n], inicio, fin, inicial)
+                        for params, n, inicio, fin in tareas
+                    ]
+                    scores = [futuro.result() for futuro in futuros]
+            finally:
+                shm.close()
+                shm.unlink()
+        else:
+            raise ValueError(f"backend desconocido: {backend}. opciones: ['thread', 'process']")
             
-        return [float(score) for score in scores]
\ No newline at end of file
+        # agrupar los scores por configuracion (en el orden de lista_params)
+        return [
+            [float(score) for score in scores[k * cv:(k + 1) * cv]]
+            for k in range(len(lista_params))
+        ]
+
+
+def _puntuar_fold(params, X, y, start_idx, end_idx, inicial=None):
+    """
+    entrena un modelo temporal sin el fold [start_idx, end_idx) y retorna su accuracy
+    inicial: (weights, bias, classes) de partida (warm start)
+    """
+    from .clasificador_estudiante import ClasificadorEstudiante
+    
+    # el fold de validacion es una vista; el de entrenamiento se pasa como indices
+    train_idx = np.concatenate([np.arange(start_idx), np.arange(end_idx, len(X))])
+    X_val = X[start_idx:end_idx]
+    y_val = y[start_idx:end_idx]
+    
+    # entrenar modelo temporal
+    temp_model = ClasificadorEstudiante(**params)
+    if inicial is not None:
+        temp_model.warm_start = True
+        temp_model.set_initial_params(*inicial)
+    temp_model.fit(X, y, indices=train_idx)
+    y_pred = temp_model.predict(X_val)
+    
+    # calcular accuracy
+    return float(np.sum(y_val == y_pred) / len(y_val))
+
+
+def _puntuar_fold_compartido(params, nombre_memoria, shape, dtype, y, start_idx, end_idx, inicial=None):
+    """version para procesos: lee X desde memoria compartida sin copiarla"""
+    shm = shared_memory.SharedMemory(name=nombre_memoria)
+    X = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    try:
+        return _puntuar_fold(params, X, y, start_idx, end_idx, inicial)
+    finally:
+        del X
+        shm.close()
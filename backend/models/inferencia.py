@@ -0,0 +1,136 @@
+"""
+inferencia.py
+inferencia ligera: solo el artefacto del modelo y numpy, con una ruta en python
+puro para una fila (sin pandas, flask ni los modulos de entrenamiento)
+"""
+
+import math
+import os
+import numpy as np
+from .artefacto import cargar_artefacto
+from .transformador import TransformadorPreprocesamiento
+
+
+# columnas limitadas a 0-100 en la limpieza (ProcesadorDatos._limpiar_numericas
+# y _limpiar_participacion)
+COLUMNAS_PORCENTAJE = ('asistencia_clases', 'tareas_entregadas', 'participacion_clase')
+
+
+class ModeloInferencia:
+    """
+    modelo listo para puntuar: al cargar, la estandarizacion se pliega en pesos y
+    sesgo, asi cada prediccion es una transformacion afin mas softmax
+
+    un registro con valores numericos (o nulos) se limpia y puntua en python puro;
+    los lotes usan numpy y los registros con texto pasan por la limpieza completa
+    de TransformadorPreprocesamiento (que importa pandas solo en ese momento)
+    """
+
+    def __init__(self, arreglos, metadatos):
+        transformador = TransformadorPreprocesamiento.desde_dict(
+            metadatos.get('preprocesamiento'), arreglos.get('scaler_mean'), arreglos.get('scaler_std')
+        )
+        weights, bias, self.transformador = transformador.plegar(arreglos['weights'], arreglos['bias'])
+
+        self.weights = np.array(weights, dtype=np.float64)
+        self.bias = np.array(bias, dtype=np.float64).reshape(-1)
+        self.weights.setflags(write=False)
+        self.bias.setflags(write=False)
+        self.clases = [str(c) for c in metadatos['classes']]
+
+        # copias en tuplas para la ruta de python puro: pesos por clase
+        self._pesos_clase = tuple(tuple(columna) for columna in self.weights.T.tolist())
+        self._bias = tuple(self.bias.tolist())
+
+    @classmethod
+    def desde_archivo(cls, ruta, mmap=True):
+        """carga el modelo desde un artefacto binario (.sgm)"""
+        if not os.path.exists(ruta):
+            raise ValueError("modelo no encontrado")
+        arreglos, metadatos, _ = cargar_artefacto(ruta, mmap=mmap)
+        return cls(arreglos, metadatos)
+
+    @property
+    def columnas_entrada(self):
+        return self.transformador.columnas_entrada
+
+    def _fila(self, registro):
+        """
+        limpieza de un registro en python puro (conversion, rangos, imputacion y
+        recorte iqr); None si necesita la limpieza completa (textos, indicadores)
+        """
+        transformador = self.transformador
+        if transformador.modo_actividades != 'conteo':
+            return None
+
+        fila = []
+        for col in transformador.columnas:
+            valor = registro[col]
+            if valor is None:
+                valor = math.nan
+            elif isinstance(valor, bool) or not isinstance(valor, (int, float)):
+                return None
+            valor = float(valor)
+
+            if math.isnan(valor):
+                if col not in transformador.medianas:
+                    return None
+                valor = float(transformador.medianas[col])
+            if col in COLUMNAS_PORCENTAJE:
+                valor = min(max(valor, 0.0), 100.0)
+            elif col == 'horas_estudio' and transformador.limites_horas_estudio is not None:
+                inferior, superior = transformador.limites_horas_estudio
+                valor = min(max(valor, inferior), superior)
+            fila.append(valor)
+        return fila
+
+    def _probabilidades(self, fila):
+        """transformacion afin mas softmax sobre una fila (listas de python)"""
+        z = [b + math.fsum(x * w for x, w in zip(fila, pesos))
+             for b, pesos in zip(self._bias, self._pesos_clase)]
+        maximo = max(z)
+        exponenciales = [math.exp(v - maximo) for v in z]
+        total = math.fsum(exponenciales)
+        return [v / total for v in exponenciales]
+
+    def predecir(self, registro):
+        """predice riesgo para un registro crudo (dict) de un estudiante"""
+        faltantes = [col for col in self.columnas_entrada if col not in registro]
+        if faltantes:
+            raise ValueError(f'faltan columnas {faltantes}')
+
+        fila = self._fila(registro)
+        if fila is None:
+            fila = self.transformador.limpiar(registro)[0].tolist()
+        probabilidades = self._probabilidades(fila)
+
+        # a igual probabilidad gana la primera clase, como np.argmax
+        indice = max(range(len(probabilidades)), key=probabilidades.__getitem__)
+        return {
+            'riesgo': self.clases[indice],
+            'probabilidades': dict(zip(self.clases, probabilidades)),
+            'confianza': probabilidades[indice]
+        }
+
+    def predecir_lote(self, X):
+        """predice riesgo para una matriz de valores limpios (sin escalar) con numpy"""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2:
+            raise ValueError("se esperaba una matriz de estudiantes x caracteristicas")
+
+        z = np.dot(X, self.weights) + self.bias
+        z -= np.max(z, axis=1, keepdims=True)
+        probabilidades = np.exp(z)
+        probabilidades /= np.sum(probabilidades, axis=1, keepdims=True)
+
+        return {
+            'clases': self.clases,
+            'total': int(len(X)),
+            'riesgo': [self.clases[i] for i in np.argmax(probabilidades, axis=1)],
+            'probabilidades': np.round(probabilidades, 6).tolist(),
+            'confianza': np.round(np.max(probabilidades, axis=1), 6).tolist()
+        }
+
+    def predecir_registros(self, registros):
+        """predice riesgo para un lote de registros crudos (limpieza completa + numpy)"""
+        return self.predecir_lote(self.transformador.limpiar(registros))
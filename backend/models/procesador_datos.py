@@ -5,33 +5,175 @@ modulo para limpieza y preprocesamiento de datos en español
 
 import pandas as pd
 import numpy as np
+import json
 import os
+import struct
+
+
+# columnas que usa el modelo (caracteristicas + variable objetivo)
+COLUMNAS_MODELO = [
+    'promedio_actual', 'asistencia_clases', 'tareas_entregadas', 'participacion_clase',
+    'horas_estudio', 'promedio_evaluaciones', 'cursos_reprobados',
+    'actividades_extracurriculares', 'reportes_disciplinarios', 'riesgo'
+]
+
+# columnas de texto que se guardan como category en la lectura por bloques
+COLUMNAS_CATEGORICAS = ['actividades_extracurriculares', 'riesgo']
+
+# textos que representan un valor faltante; se pasan a read_csv como na_values
+VALORES_NULOS = ['', ' ', 'nan', 'NaN', 'null']
+
+# valores de actividades_extracurriculares que cuentan como "sin actividades"
+ACTIVIDADES_VACIAS = ['[]', '', 'nan', 'none', 'null', 'NaN']
+
+# elemento vacio dentro de una lista: solo espacios y comillas
+PATRON_ELEMENTO_VACIO = r"(?:^|,)\s*['\"]*\s*(?=,|$)"
+
+# columnas numericas que se imputan con la mediana
+COLUMNAS_IMPUTABLES = [
+    'promedio_actual', 'asistencia_clases', 'tareas_entregadas',
+    'participacion_clase', 'horas_estudio', 'promedio_evaluaciones',
+    'cursos_reprobados', 'actividades_extracurriculares', 'reportes_disciplinarios'
+]
+
+# limpieza incremental: drift (psi) a partir del cual se recalculan las estadisticas
+# y filas minimas de un lote para medirlo
+UMBRAL_DRIFT = 0.2
+MIN_FILAS_DRIFT = 30
+
+# estado de la limpieza incremental dentro del directorio de datos
+ARCHIVO_ESTADISTICAS = 'estadisticas_limpieza.json'
+ARCHIVO_INDICE_FILAS = 'indice_filas.npy'
+ARCHIVO_CRUDOS = 'datos_crudos.csv'
+
+
+class _HistogramaValores:
+    """
+    acumula conteos de valores para estimar medianas y cuantiles sin guardar la
+    columna completa. los conteos son exactos mientras haya pocos valores
+    distintos; al superar max_valores se redondean a `decimales`
+    """
+    
+    def __init__(self, decimales=3, max_valores=200000):
+        self.decimales = decimales
+        self.max_valores = max_valores
+        self.redondeado = False
+        self.conteos = pd.Series(dtype=np.float64)
+        
+    def agregar(self, serie, repeticiones=1):
+        serie = serie.dropna()
+        if self.redondeado:
+            serie = serie.round(self.decimales)
+        self.conteos = self.conteos.add(serie.value_counts() * repeticiones, fill_value=0)
+        
+        # demasiados valores distintos: pasar a conteos redondeados
+        if not self.redondeado and len(self.conteos) > self.max_valores:
+            self.conteos = self.conteos.groupby(self.conteos.index.to_numpy().round(self.decimales)).sum()
+            self.redondeado = True
+            
+    def total(self):
+        return int(self.conteos.sum())
+        
+    def cuantil(self, q):
+        """cuantil con interpolacion lineal, igual que Series.quantile"""
+        if self.conteos.empty:
+            return np.nan
+        conteos = self.conteos.sort_index()
+        valores = conteos.index.to_numpy(dtype=np.float64)
+        acumulado = np.cumsum(conteos.to_numpy())
+        
+        posicion = (acumulado[-1] - 1) * q
+        inferior = int(np.floor(posicion))
+        superior = min(inferior + 1, int(acumulado[-1]) - 1)
+        v_inf = valores[np.searchsorted(acumulado, inferior, side='right')]
+        v_sup = valores[np.searchsorted(acumulado, superior, side='right')]
+        return float(v_inf + (posicion - inferior) * (v_sup - v_inf))
 
 
 class ProcesadorDatos:
+    # formas de representar actividades_extracurriculares
+    MODOS_ACTIVIDADES = ('conteo', 'indicadores')
+    
     def __init__(self):
         self.datos_originales = None
         self.datos_limpios = None
         self.registros = []
+        # medianas, moda, limites iqr y perfil de distribucion de la ultima limpieza completa
+        self.estadisticas_limpieza = None
         
     def cargar_datos(self, datos):
-        """carga datos desde un dataframe"""
-        self.datos_originales = datos.copy()
+        """carga datos desde un dataframe (sin copiarlo: la limpieza nunca lo modifica)"""
+        self.datos_originales = datos
         self.registros.append("datos cargados exitosamente")
         
-    def limpiar_datos(self):
-        """ejecuta todo el pipeline de limpieza"""
+    def cargar_csv_por_bloques(self, archivo, tamano_bloque=50000):
+        """
+        lee un csv por bloques conservando solo COLUMNAS_MODELO con tipos compactos
+        (float32 para numericas, category para texto); la memoria de lectura depende
+        del tamaño del bloque y no del archivo. registra el progreso por bloque
+        (bloques y filas leidas: la posicion del archivo no sirve de porcentaje
+        porque pandas lee por adelantado y el cuerpo multipart no es solo el csv)
+        """
+        self.registros = []
+        columnas_numericas = [col for col in COLUMNAS_MODELO if col not in COLUMNAS_CATEGORICAS]
+        
+        # las numericas se leen como texto y se convierten por bloque para que un
+        # valor invalido quede como nan en lugar de abortar la lectura
+        lector = pd.read_csv(
+            archivo,
+            usecols=lambda col: col in COLUMNAS_MODELO,
+            dtype={col: 'category' for col in COLUMNAS_CATEGORICAS},
+            na_values=VALORES_NULOS,
+            chunksize=tamano_bloque
+        )
+        
+        bloques = {col: [] for col in COLUMNAS_MODELO}
+        filas = 0
+        for numero, bloque in enumerate(lector, start=1):
+            columnas_faltantes = [col for col in COLUMNAS_MODELO if col not in bloque.columns]
+            if columnas_faltantes:
+                raise ValueError(f'columnas faltantes: {columnas_faltantes}')
+                
+            for col in columnas_numericas:
+                bloques[col].append(pd.to_numeric(bloque[col], errors='coerce').to_numpy(dtype=np.float32))
+            for col in COLUMNAS_CATEGORICAS:
+                bloques[col].append(bloque[col].astype('category'))
+            filas += len(bloque)
+            
+            self.registros.append(f'bloque {numero}: {filas} filas leidas')
+            
+        if filas == 0:
+            raise ValueError("el archivo no contiene filas")
+            
+        # unir bloques; las categorias de cada bloque se combinan sin pasar a object
+        columnas = {}
+        for col in columnas_numericas:
+            columnas[col] = np.concatenate(bloques[col])
+        for col in COLUMNAS_CATEGORICAS:
+            columnas[col] = pd.api.types.union_categoricals(bloques[col], ignore_order=True)
+            
+        datos = pd.DataFrame(columnas)[COLUMNAS_MODELO]
+        memoria_mb = datos.memory_usage(deep=True).sum() / 1024 ** 2
+        self.registros.append(f'lectura completada: {filas} filas, {memoria_mb:.2f} MB en memoria')
+        
+        self.cargar_datos(datos)
+        return datos
+        
+    def limpiar_datos(self, modo_actividades='conteo'):
+        """
+        ejecuta todo el pipeline de limpieza
+        modo_actividades: 'conteo' (una columna numerica) o 'indicadores'
+        (una columna 0/1 actividad_<nombre> por cada actividad)
+        """
         if self.datos_originales is None:
             raise ValueError("no hay datos cargados")
+        if modo_actividades not in self.MODOS_ACTIVIDADES:
+            raise ValueError(f"modo_actividades desconocido: {modo_actividades}. opciones: {list(self.MODOS_ACTIVIDADES)}")
             
         self.registros = []
         
         # seleccionar columnas para el modelo
-        columnas_modelo = [
-            'promedio_actual', 'asistencia_clases', 'tareas_entregadas', 'participacion_clase',
-            'horas_estudio', 'promedio_evaluaciones', 'cursos_reprobados', 
-            'actividades_extracurriculares', 'reportes_disciplinarios', 'riesgo'
-        ]
+        columnas_modelo = COLUMNAS_MODELO
         
         # verificar columnas
         columnas_faltantes = [col for col in columnas_modelo if col not in self.datos_originales.columns]
@@ -39,14 +181,16 @@ class ProcesadorDatos:
             raise ValueError(f'columnas faltantes: {columnas_faltantes}')
             
         self.registros.append('paso 1: seleccion de columnas para el modelo')
-        datos_trabajo = self.datos_originales[columnas_modelo].copy()
+        # marco nuevo que referencia las columnas originales sin copiarlas; cada paso
+        # reemplaza columnas completas, nunca escribe sobre los datos originales
+        datos_trabajo = pd.DataFrame({col: self.datos_originales[col] for col in columnas_modelo}, copy=False)
         self.registros.append(f'seleccionadas {len(columnas_modelo)} columnas')
         
         # limpiar columnas numericas
         datos_trabajo = self._limpiar_numericas(datos_trabajo)
         
         # limpiar actividades extracurriculares
-        datos_trabajo = self._limpiar_actividades(datos_trabajo)
+        datos_trabajo = self._limpiar_actividades(datos_trabajo, modo_actividades)
         
         # limpiar participacion en clase
         datos_trabajo = self._limpiar_participacion(datos_trabajo)
@@ -54,21 +198,201 @@ class ProcesadorDatos:
         # limpiar variable objetivo
         datos_trabajo = self._limpiar_riesgo(datos_trabajo)
         
+        # estadisticas que se congelan para la limpieza incremental (antes de imputar)
+        medianas = {col: datos_trabajo[col].median() for col in COLUMNAS_IMPUTABLES if col in datos_trabajo.columns}
+        moda = datos_trabajo['riesgo'].mode()
+        moda_riesgo = moda.iloc[0] if not moda.empty else 'medio'
+        perfil = self._perfil_datos(datos_trabajo)
+        
         # imputar valores faltantes
-        datos_trabajo = self._imputar_valores(datos_trabajo)
+        datos_trabajo = self._imputar_valores(datos_trabajo, medianas, moda_riesgo)
         
         # tratar outliers
-        datos_trabajo = self._tratar_outliers(datos_trabajo)
+        limites = self._limites_iqr(datos_trabajo['horas_estudio'])
+        datos_trabajo = self._tratar_outliers(datos_trabajo, limites)
         
         # eliminar duplicados
         datos_trabajo = self._eliminar_duplicados(datos_trabajo)
         
         # guardar datos limpios
         self.datos_limpios = datos_trabajo
+        self.estadisticas_limpieza = {
+            'version': 1,
+            'modo_actividades': modo_actividades,
+            'filas': int(len(datos_trabajo)),
+            'medianas': {col: None if pd.isna(v) else float(v) for col, v in medianas.items()},
+            'moda_riesgo': str(moda_riesgo),
+            'limites_horas_estudio': [float(limites[0]), float(limites[1])],
+            'perfil': perfil
+        }
         self.registros.append('limpieza completada exitosamente')
         
         return self.datos_limpios
         
+    def limpiar_csv_por_bloques(self, ruta_entrada, ruta_salida, tamano_bloque=50000, decimales=3, max_valores=200000,
+                                ruta_binarios=None):
+        """
+        limpieza fuera de memoria en dos pasadas sobre un csv:
+        1) limpia cada bloque fila a fila y acumula histogramas para medianas y
+           cuartiles de horas_estudio, mas la distribucion de riesgo
+        2) vuelve a leer, imputa y recorta con esas estadisticas, descarta duplicados
+           con un indice ordenado de hashes de fila (hashes_filas) y agrega cada
+           bloque a ruta_salida y, si se indica ruta_binarios, a los arreglos .npy
+           de guardar_datos_binarios (creados con las filas de la pasada 1 y
+           recortados al final a las que quedan)
+        tolerancia frente a limpiar_datos: medianas y limites iqr son exactos mientras
+        cada columna tenga hasta max_valores valores distintos; por encima se calculan
+        sobre valores redondeados a `decimales` (error maximo 0.5 * 10**-decimales).
+        los duplicados siguen la regla de drop_duplicates (valores float64 exactos,
+        ver hashes_filas): filas que difieren en cualquier decimal se conservan, y
+        dos filas distintas solo se confundirian por una colision de hashes de 64 bits.
+        solo soporta actividades en modo 'conteo'
+        """
+        self.registros = []
+        columnas_imputables = [col for col in COLUMNAS_MODELO if col != 'riesgo']
+        
+        def leer_bloques():
+            return pd.read_csv(
+                ruta_entrada,
+                usecols=lambda col: col in COLUMNAS_MODELO,
+                na_values=VALORES_NULOS,
+                chunksize=tamano_bloque
+            )
+            
+        # pasada 1: estadisticas globales
+        histogramas = {col: _HistogramaValores(decimales, max_valores) for col in columnas_imputables}
+        nulos = {col: 0 for col in columnas_imputables}
+        distribucion_riesgo = pd.Series(dtype=np.int64)
+        filas_leidas = 0
+        for bloque in leer_bloques():
+            bloque = self._limpiar_bloque(bloque)
+            for col in columnas_imputables:
+                histogramas[col].agregar(bloque[col])
+                nulos[col] += int(bloque[col].isna().sum())
+            distribucion_riesgo = distribucion_riesgo.add(bloque['riesgo'].value_counts(), fill_value=0)
+            filas_leidas += len(bloque)
+        self.registros.append(f'pasada 1: {filas_leidas} filas analizadas')
+        
+        if filas_leidas == 0:
+            raise ValueError("el archivo no contiene filas")
+            
+        medianas = {}
+        for col in columnas_imputables:
+            mediana = histogramas[col].cuantil(0.5)
+            medianas[col] = 0 if pd.isna(mediana) else mediana
+            if nulos[col] > 0:
+                self.registros.append(f'{col}: {nulos[col]} valores imputados')
+        moda_riesgo = distribucion_riesgo.idxmax() if not distribucion_riesgo.empty else 'medio'
+        
+        # los cuartiles se calculan despues de imputar, como en _tratar_outliers
+        histograma_horas = histogramas['horas_estudio']
+        if nulos['horas_estudio'] > 0:
+            histograma_horas.agregar(pd.Series([medianas['horas_estudio']]), repeticiones=nulos['horas_estudio'])
+        q1 = histograma_horas.cuantil(0.25)
+        q3 = histograma_horas.cuantil(0.75)
+        iqr = q3 - q1
+        limite_inferior = max(0, q1 - 1.5 * iqr)
+        limite_superior = q3 + 1.5 * iqr
+        self.registros.append(f'horas_estudio limitadas a [{limite_inferior:.1f}, {limite_superior:.1f}]')
+        
+        # pasada 2: aplicar estadisticas y escribir bloques limpios
+        os.makedirs(os.path.dirname(ruta_salida) or '.', exist_ok=True)
+        columnas = [col for col in COLUMNAS_MODELO if col != 'riesgo']
+        clases = np.unique(np.append(distribucion_riesgo.index.astype(str), str(moda_riesgo)))
+        if ruta_binarios:
+            # el esquema anterior ya no describe los arreglos que se van a escribir
+            os.makedirs(os.path.dirname(ruta_binarios) or '.', exist_ok=True)
+            if os.path.exists(f'{ruta_binarios}.json'):
+                os.remove(f'{ruta_binarios}.json')
+            rutas_binarias = {'X': f'{ruta_binarios}_X.npy', 'y': f'{ruta_binarios}_y.npy'}
+            X_binario = np.lib.format.open_memmap(rutas_binarias['X'], mode='w+', dtype=np.float64,
+                                                  shape=(filas_leidas, len(columnas)))
+            y_binario = np.lib.format.open_memmap(rutas_binarias['y'], mode='w+', dtype=np.int16,
+                                                  shape=(filas_leidas,))
+                                                  
+        hashes_vistos = np.empty(0, dtype=np.uint64)
+        distribucion_limpia = pd.Series(dtype=np.int64)
+        filas_escritas = 0
+        for numero, bloque in enumerate(leer_bloques()):
+            bloque = self._limpiar_bloque(bloque)
+            bloque = bloque.fillna(medianas)
+            bloque['riesgo'] = bloque['riesgo'].fillna(moda_riesgo)
+            bloque['horas_estudio'] = bloque['horas_estudio'].clip(lower=limite_inferior, upper=limite_superior)
+            
+            # duplicados dentro del bloque y contra bloques anteriores (indice ordenado)
+            unicos, primeros = np.unique(hashes_filas(bloque), return_index=True)
+            if len(hashes_vistos):
+                posiciones = np.minimum(np.searchsorted(hashes_vistos, unicos), len(hashes_vistos) - 1)
+                nuevos = hashes_vistos[posiciones] != unicos
+                unicos, primeros = unicos[nuevos], primeros[nuevos]
+            hashes_vistos = np.insert(hashes_vistos, np.searchsorted(hashes_vistos, unicos), unicos)
+            bloque = bloque.iloc[np.sort(primeros)]
+            
+            bloque.to_csv(ruta_salida, mode='w' if numero == 0 else 'a', header=numero == 0, index=False)
+            if ruta_binarios:
+                fin = filas_escritas + len(bloque)
+                X_binario[filas_escritas:fin] = bloque[columnas].to_numpy(dtype=np.float64)
+                y_binario[filas_escritas:fin] = np.searchsorted(clases, bloque['riesgo'].astype(str).to_numpy())
+            distribucion_limpia = distribucion_limpia.add(bloque['riesgo'].value_counts(), fill_value=0)
+            filas_escritas += len(bloque)
+            
+        self.registros.append(f'pasada 2: eliminados {filas_leidas - filas_escritas} duplicados')
+        self.registros.append(f'datos guardados en {ruta_salida}')
+        
+        # mismas estadisticas que limpiar_datos (sin perfil: esta limpieza no mide drift)
+        self.estadisticas_limpieza = {
+            'version': 1,
+            'modo_actividades': 'conteo',
+            'filas': int(filas_escritas),
+            'medianas': {col: float(v) for col, v in medianas.items()},
+            'moda_riesgo': str(moda_riesgo),
+            'limites_horas_estudio': [float(limite_inferior), float(limite_superior)],
+            'perfil': {}
+        }
+        
+        if ruta_binarios:
+            # liberar los mapeos, dejar solo las filas escritas y cerrar con el esquema
+            X_binario.flush()
+            y_binario.flush()
+            del X_binario, y_binario
+            for ruta in rutas_binarias.values():
+                _recortar_npy(ruta, filas_escritas)
+            _escribir_esquema_binario(ruta_binarios, self._esquema_binario(
+                filas_escritas, columnas, clases, np.float64, np.int16, rutas_binarias
+            ))
+            self.registros.append(f"datos binarios guardados en {rutas_binarias['X']}")
+        
+        return {
+            'filas_leidas': int(filas_leidas),
+            'filas_escritas': int(filas_escritas),
+            'columnas': columnas + ['riesgo'],
+            'medianas': {col: float(v) for col, v in medianas.items()},
+            'limites_horas_estudio': [float(limite_inferior), float(limite_superior)],
+            'distribucion_riesgo': {k: int(v) for k, v in distribucion_riesgo.items()},
+            'distribucion_riesgo_limpia': {str(k): int(v) for k, v in distribucion_limpia.items()}
+        }
+        
+    def _limpiar_bloque(self, bloque):
+        """pasos fila a fila de limpiar_datos (pasos 2-5) sin registrar mensajes"""
+        columnas_faltantes = [col for col in COLUMNAS_MODELO if col not in bloque.columns]
+        if columnas_faltantes:
+            raise ValueError(f'columnas faltantes: {columnas_faltantes}')
+            
+        registros = self.registros
+        self.registros = []
+        try:
+            datos = pd.DataFrame({col: bloque[col] for col in COLUMNAS_MODELO}, copy=False)
+            datos = self._limpiar_numericas(datos)
+            datos = self._limpiar_actividades(datos)
+            datos = self._limpiar_participacion(datos)
+            datos = self._limpiar_riesgo(datos)
+        finally:
+            self.registros = registros
+            
+        # tipos estables entre bloques
+        columnas_flotantes = [col for col in COLUMNAS_MODELO if col not in ('actividades_extracurriculares', 'riesgo')]
+        return datos.astype({col: np.float64 for col in columnas_flotantes})
+        
     def _limpiar_numericas(self, datos):
         """limpia columnas numericas"""
         self.registros.append('paso 2: conversion de tipos numericos')
@@ -82,9 +406,11 @@ class ProcesadorDatos:
         for col in columnas_numericas:
             if col in datos.columns:
                 antes = int(datos[col].isna().sum())
-                datos[col] = datos[col].astype(str)
-                datos[col] = datos[col].replace(['', ' ', 'nan', 'NaN', 'null'], pd.NA)
-                datos[col] = pd.to_numeric(datos[col], errors='coerce')
+                # columnas ya numericas se conservan; el resto se convierte en una
+                # sola pasada (los textos de VALORES_NULOS no son numeros y quedan como nan)
+                serie = datos[col]
+                if not (pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie)):
+                    datos[col] = pd.to_numeric(serie, errors='coerce')
                 despues = int(datos[col].isna().sum())
                 self.registros.append(f'columna {col}: nulos antes {antes}, despues {despues}')
                 
@@ -97,34 +423,57 @@ class ProcesadorDatos:
                 
         return datos
         
-    def _limpiar_actividades(self, datos):
-        """limpia y cuenta actividades extracurriculares"""
+    def _limpiar_actividades(self, datos, modo='conteo'):
+        """limpia y cuenta actividades extracurriculares con operaciones vectorizadas"""
         self.registros.append('paso 3: conteo de actividades extracurriculares')
         
         if 'actividades_extracurriculares' in datos.columns:
-            datos['actividades_extracurriculares'] = datos['actividades_extracurriculares'].astype(str)
-            
-            def contar_actividades(texto):
-                try:
-                    texto = texto.strip()
-                    if texto in ['[]', '', 'nan', 'none', 'null', 'NaN']:
-                        return 0
-                    if texto.startswith('[') and texto.endswith(']'):
-                        contenido = texto[1:-1].strip()
-                        if contenido == '':
-                            return 0
-                        elementos = contenido.split(',')
-                        return len([e for e in elementos if e.strip().strip("'\"") != ''])
-                    else:
-                        return 1 if texto != '' else 0
-                except:
-                    return 0
+            # los registros repiten pocas combinaciones: se analiza cada valor distinto
+            # una sola vez y el resultado se expande con los codigos (nulos = -1)
+            codigos, unicos = pd.factorize(datos['actividades_extracurriculares'])
+            texto = pd.Series(unicos, dtype=object).astype(str).str.strip()
+            vacio = (texto.isna() | texto.isin(ACTIVIDADES_VACIAS)).to_numpy()
+            es_lista = ~vacio & texto.str.startswith('[').fillna(False).to_numpy() & texto.str.endswith(']').fillna(False).to_numpy()
+            contenido = texto.str.slice(1, -1)
             
-            datos['actividades_extracurriculares'] = datos['actividades_extracurriculares'].apply(contar_actividades)
+            if modo == 'indicadores':
+                indicadores = self._indicadores_actividades(texto, contenido, vacio, es_lista, codigos, datos.index)
+                datos = pd.concat([datos.drop(columns='actividades_extracurriculares'), indicadores], axis=1)
+                self.registros.append(f'actividades convertidas a {indicadores.shape[1]} columnas indicadoras')
+                return datos
+                
+            # en listas: elementos separados por coma menos los vacios ('' o solo comillas)
+            elementos = contenido.str.count(',').to_numpy() + 1
+            elementos_vacios = contenido.str.count(PATRON_ELEMENTO_VACIO).to_numpy()
+            conteo_unicos = np.where(vacio, 0, np.where(es_lista, elementos - elementos_vacios, 1))
+            
+            # la posicion extra (codigo -1) corresponde a valores nulos
+            conteo_unicos = np.append(conteo_unicos, 0).astype(np.int64)
+            datos['actividades_extracurriculares'] = conteo_unicos[codigos]
             self.registros.append('actividades convertidas a conteo numerico')
             
         return datos
         
+    def _indicadores_actividades(self, texto, contenido, vacio, es_lista, codigos, indice):
+        """construye una columna 0/1 por actividad (actividad_<nombre>)"""
+        # cada lista se separa en elementos; un texto suelto es una sola actividad
+        elementos = contenido[es_lista].str.split(',').explode()
+        elementos = pd.concat([elementos, texto[~vacio & ~es_lista]])
+        elementos = elementos.str.strip().str.strip('\'"').str.strip().str.lower()
+        elementos = elementos[elementos != ''].str.replace(r'\s+', '_', regex=True)
+        
+        nombres, posiciones = np.unique(elementos.to_numpy(dtype=str), return_inverse=True)
+        
+        # matriz por valor distinto, con una fila extra de ceros para los nulos
+        matriz = np.zeros((len(texto) + 1, len(nombres)), dtype=np.int64)
+        matriz[elementos.index.to_numpy(), posiciones.ravel()] = 1
+        
+        return pd.DataFrame(
+            matriz[codigos],
+            index=indice,
+            columns=[f'actividad_{nombre}' for nombre in nombres]
+        )
+        
     def _limpiar_participacion(self, datos):
         """normaliza participacion en clase"""
         self.registros.append('paso 4: normalizacion de participacion en clase')
@@ -152,22 +501,20 @@ class ProcesadorDatos:
             
         return datos
         
-    def _imputar_valores(self, datos):
-        """imputa valores faltantes"""
+    def _imputar_valores(self, datos, medianas=None, moda_riesgo=None):
+        """
+        imputa valores faltantes
+        medianas / moda_riesgo (opcionales) son estadisticas ya calculadas o congeladas
+        """
         self.registros.append('paso 6: imputacion de valores faltantes')
+        medianas = medianas or {}
         
-        columnas_numericas = [
-            'promedio_actual', 'asistencia_clases', 'tareas_entregadas', 
-            'participacion_clase', 'horas_estudio', 'promedio_evaluaciones',
-            'cursos_reprobados', 'actividades_extracurriculares', 'reportes_disciplinarios'
-        ]
-        
-        for col in columnas_numericas:
+        for col in COLUMNAS_IMPUTABLES:
             if col in datos.columns:
                 antes = int(datos[col].isna().sum())
                 if antes > 0:
-                    mediana = datos[col].median()
-                    if pd.isna(mediana):
+                    mediana = medianas[col] if col in medianas else datos[col].median()
+                    if mediana is None or pd.isna(mediana):
                         datos[col] = datos[col].fillna(0)
                     else:
                         datos[col] = datos[col].fillna(mediana)
@@ -177,23 +524,30 @@ class ProcesadorDatos:
         if 'riesgo' in datos.columns:
             antes = int(datos['riesgo'].isna().sum())
             if antes > 0:
-                moda = datos['riesgo'].mode()
-                valor_relleno = moda.iloc[0] if not moda.empty else 'medio'
+                if moda_riesgo is not None:
+                    valor_relleno = moda_riesgo
+                else:
+                    moda = datos['riesgo'].mode()
+                    valor_relleno = moda.iloc[0] if not moda.empty else 'medio'
                 datos['riesgo'] = datos['riesgo'].fillna(valor_relleno)
                 self.registros.append(f'riesgo: {antes} valores imputados con {valor_relleno}')
                 
         return datos
         
-    def _tratar_outliers(self, datos):
-        """trata outliers en horas de estudio"""
+    @staticmethod
+    def _limites_iqr(serie):
+        """limites [max(0, q1 - 1.5 iqr), q3 + 1.5 iqr] para recortar outliers"""
+        q1 = serie.quantile(0.25)
+        q3 = serie.quantile(0.75)
+        iqr = q3 - q1
+        return max(0, q1 - 1.5 * iqr), q3 + 1.5 * iqr
+        
+    def _tratar_outliers(self, datos, limites=None):
+        """trata outliers en horas de estudio (limites opcionales: ya calculados o congelados)"""
         self.registros.append('paso 7: tratamiento de outliers')
         
         if 'horas_estudio' in datos.columns:
-            q1 = datos['horas_estudio'].quantile(0.25)
-            q3 = datos['horas_estudio'].quantile(0.75)
-            iqr = q3 - q1
-            limite_inferior = max(0, q1 - 1.5 * iqr)
-            limite_superior = q3 + 1.5 * iqr
+            limite_inferior, limite_superior = limites if limites is not None else self._limites_iqr(datos['horas_estudio'])
             datos['horas_estudio'] = datos['horas_estudio'].clip(lower=limite_inferior, upper=limite_superior)
             self.registros.append(f'horas_estudio limitadas a [{limite_inferior:.1f}, {limite_superior:.1f}]')
             
@@ -208,6 +562,167 @@ class ProcesadorDatos:
         self.registros.append(f'paso 8: eliminados {eliminados} duplicados')
         return datos
         
+    def _perfil_datos(self, datos):
+        """
+        distribucion de referencia para medir drift: por columna numerica, bordes
+        de deciles y proporcion de filas en cada intervalo; para riesgo, proporcion
+        de cada clase (valores observados, antes de imputar)
+        """
+        perfil = {}
+        for col in COLUMNAS_IMPUTABLES:
+            if col not in datos.columns:
+                continue
+            valores = datos[col].dropna().to_numpy(dtype=np.float64)
+            if len(valores) == 0:
+                continue
+            bordes = np.unique(np.quantile(valores, np.linspace(0.1, 0.9, 9)))
+            conteos = np.bincount(np.searchsorted(bordes, valores, side='right'), minlength=len(bordes) + 1)
+            perfil[col] = {'bordes': bordes.tolist(), 'proporciones': (conteos / len(valores)).tolist()}
+            
+        if 'riesgo' in datos.columns:
+            proporciones = datos['riesgo'].dropna().astype(str).value_counts(normalize=True)
+            perfil['riesgo'] = {'categorias': proporciones.index.tolist(), 'proporciones': proporciones.tolist()}
+        return perfil
+        
+    @staticmethod
+    def _psi(referencia, serie):
+        """
+        indice de estabilidad poblacional (psi) de la serie frente a su perfil de
+        referencia; None si hay menos de MIN_FILAS_DRIFT valores observados
+        """
+        serie = serie.dropna()
+        if len(serie) < MIN_FILAS_DRIFT:
+            return None
+            
+        esperado = np.asarray(referencia['proporciones'], dtype=np.float64)
+        if 'categorias' in referencia:
+            # las clases que no existian en la referencia forman un grupo extra
+            conteos = serie.astype(str).value_counts()
+            observado = conteos.reindex(referencia['categorias'], fill_value=0).to_numpy(dtype=np.float64)
+            observado = np.append(observado, conteos.sum() - observado.sum())
+            esperado = np.append(esperado, 0.0)
+        else:
+            posiciones = np.searchsorted(np.asarray(referencia['bordes']), serie.to_numpy(dtype=np.float64), side='right')
+            observado = np.bincount(posiciones, minlength=len(esperado)).astype(np.float64)
+            
+        observado = np.clip(observado / len(serie), 1e-4, None)
+        esperado = np.clip(esperado, 1e-4, None)
+        return float(np.sum((observado - esperado) * np.log(observado / esperado)))
+        
+    def limpiar_incremental(self, nuevos, estadisticas, hashes_existentes):
+        """
+        limpia solo un lote nuevo con las estadisticas congeladas de la ultima
+        limpieza completa (medianas, moda de riesgo, limites iqr) y descarta filas
+        repetidas dentro del lote o ya presentes en hashes_existentes (ordenado)
+        retorna (datos limpios del lote, sus hashes, informe con el drift por columna)
+        """
+        if estadisticas.get('modo_actividades', 'conteo') != 'conteo':
+            raise ValueError("la limpieza incremental solo soporta actividades en modo 'conteo'")
+            
+        self.registros = []
+        datos = self._limpiar_bloque(nuevos)
+        filas_recibidas = len(datos)
+        
+        # drift sobre los valores observados, antes de imputar
+        drift = {col: self._psi(referencia, datos[col])
+                 for col, referencia in estadisticas['perfil'].items() if col in datos.columns}
+        medidos = [v for v in drift.values() if v is not None]
+        drift_maximo = max(medidos) if medidos else None
+        
+        # pasos 6 y 7 con las estadisticas congeladas
+        datos = self._imputar_valores(datos, estadisticas['medianas'], estadisticas['moda_riesgo'])
+        datos = self._tratar_outliers(datos, estadisticas['limites_horas_estudio'])
+        
+        # duplicados dentro del lote y contra el indice persistente
+        hashes = hashes_filas(datos)
+        _, primeros = np.unique(hashes, return_index=True)
+        nuevo = np.zeros(len(datos), dtype=bool)
+        nuevo[primeros] = True
+        if len(hashes_existentes):
+            posiciones = np.minimum(np.searchsorted(hashes_existentes, hashes), len(hashes_existentes) - 1)
+            nuevo &= hashes_existentes[posiciones] != hashes
+        datos, hashes = datos[nuevo], hashes[nuevo]
+        self.registros.append(f'paso 8: eliminados {filas_recibidas - len(datos)} duplicados')
+        
+        informe = {
+            'filas_recibidas': int(filas_recibidas),
+            'filas_nuevas': int(len(datos)),
+            'duplicados': int(filas_recibidas - len(datos)),
+            'drift': drift,
+            'drift_maximo': drift_maximo
+        }
+        return datos, hashes, informe
+        
+    def anexar_datos(self, nuevos, directorio, ruta_limpios, umbral_drift=UMBRAL_DRIFT, forzar_refresco=False,
+                     ruta_binarios=None):
+        """
+        ingesta de solo anexar: el lote crudo se agrega a datos_crudos.csv y solo sus
+        filas se limpian (limpiar_incremental) y se agregan a ruta_limpios (y al
+        almacen binario ruta_binarios, si se indica). si el drift maximo supera
+        umbral_drift (o forzar_refresco) se rehace la limpieza completa sobre todos
+        los datos crudos y se recalculan las estadisticas
+        """
+        estadisticas, indice = cargar_estado_incremental(directorio)
+        columnas_faltantes = [col for col in COLUMNAS_MODELO if col not in nuevos.columns]
+        if columnas_faltantes:
+            raise ValueError(f'columnas faltantes: {columnas_faltantes}')
+            
+        datos_limpios, hashes, informe = self.limpiar_incremental(nuevos, estadisticas, indice)
+        self.estadisticas_limpieza = estadisticas
+        
+        # los datos crudos se conservan siempre: son la base de un refresco
+        ruta_crudos = os.path.join(directorio, ARCHIVO_CRUDOS)
+        nuevos[COLUMNAS_MODELO].to_csv(ruta_crudos, mode='a', header=not os.path.exists(ruta_crudos), index=False)
+        
+        refrescar = forzar_refresco or (informe['drift_maximo'] is not None and informe['drift_maximo'] > umbral_drift)
+        informe['refrescado'] = bool(refrescar)
+        
+        if refrescar:
+            motivo = 'refresco forzado' if forzar_refresco else \
+                f"drift {informe['drift_maximo']:.3f} supera el umbral {umbral_drift}"
+            self.cargar_datos(pd.read_csv(ruta_crudos, na_values=VALORES_NULOS))
+            self.limpiar_datos()
+            self.guardar_datos_limpios(ruta_limpios)
+            if ruta_binarios:
+                self.guardar_datos_binarios(ruta_binarios)
+            self.guardar_estado_incremental(directorio, guardar_crudos=False)
+            self.registros.insert(0, f'{motivo}: limpieza completa sobre todos los datos crudos')
+            informe['filas_totales'] = int(len(self.datos_limpios))
+            return informe
+            
+        # solo anexar: las filas nuevas van al final del almacen limpio
+        if self.datos_limpios is None:
+            self.datos_limpios = pd.read_csv(ruta_limpios)
+        datos_limpios.to_csv(ruta_limpios, mode='a', header=False, index=False)
+        self.datos_limpios = pd.concat([self.datos_limpios, datos_limpios], ignore_index=True)
+        if ruta_binarios:
+            self.anexar_datos_binarios(ruta_binarios, datos_limpios)
+        _guardar_indice_filas(directorio, np.union1d(indice, hashes))
+        
+        self.registros.append(f"{informe['filas_nuevas']} filas anexadas a {ruta_limpios}")
+        informe['filas_totales'] = int(len(self.datos_limpios))
+        return informe
+        
+    def guardar_estado_incremental(self, directorio, guardar_crudos=True):
+        """
+        guarda lo necesario para anexar lotes despues de una limpieza completa:
+        estadisticas congeladas, indice de hashes de filas limpias y (opcional)
+        copia de los datos crudos para futuros refrescos
+        """
+        if self.datos_limpios is None or self.estadisticas_limpieza is None:
+            raise ValueError("no hay datos limpios para guardar")
+            
+        os.makedirs(directorio, exist_ok=True)
+        if guardar_crudos:
+            self.datos_originales[COLUMNAS_MODELO].to_csv(os.path.join(directorio, ARCHIVO_CRUDOS), index=False)
+        _guardar_indice_filas(directorio, np.unique(hashes_filas(self.datos_limpios)))
+        
+        # las estadisticas se escriben al final: su presencia indica un estado completo
+        ruta = os.path.join(directorio, ARCHIVO_ESTADISTICAS)
+        with open(f'{ruta}.tmp', 'w') as f:
+            json.dump(self.estadisticas_limpieza, f, indent=2)
+        os.replace(f'{ruta}.tmp', ruta)
+        
     def guardar_datos_limpios(self, ruta):
         """guarda datos limpios en csv"""
         if self.datos_limpios is None:
@@ -217,6 +732,91 @@ class ProcesadorDatos:
         self.datos_limpios.to_csv(ruta, index=False)
         self.registros.append(f'datos guardados en {ruta}')
         
+    def guardar_datos_binarios(self, ruta_base):
+        """
+        guarda datos limpios en formato binario columnar listo para entrenar:
+        <ruta_base>_X.npy (matriz float64 de caracteristicas), <ruta_base>_y.npy
+        (codigos enteros de riesgo) y <ruta_base>.json (esquema y tipos)
+        """
+        if self.datos_limpios is None:
+            raise ValueError("no hay datos limpios para guardar")
+        if 'riesgo' not in self.datos_limpios.columns:
+            raise ValueError("columna riesgo no encontrada")
+            
+        os.makedirs(os.path.dirname(ruta_base) or '.', exist_ok=True)
+        columnas = [col for col in self.datos_limpios.columns if col != 'riesgo']
+        X = np.ascontiguousarray(self.datos_limpios[columnas].to_numpy(dtype=np.float64))
+        clases, codigos = np.unique(self.datos_limpios['riesgo'].astype(str).to_numpy(), return_inverse=True)
+        codigos = codigos.ravel().astype(np.int16)
+        
+        rutas = {
+            'X': f'{ruta_base}_X.npy',
+            'y': f'{ruta_base}_y.npy',
+            'esquema': f'{ruta_base}.json'
+        }
+        np.save(rutas['X'], X)
+        np.save(rutas['y'], codigos)
+        
+        # el esquema se escribe al final: su presencia indica que los arreglos estan completos
+        _escribir_esquema_binario(ruta_base, self._esquema_binario(X.shape[0], columnas, clases, X.dtype,
+                                                                   codigos.dtype, rutas))
+        self.registros.append(f"datos binarios guardados en {rutas['X']}")
+        return rutas
+        
+    def _esquema_binario(self, filas, columnas, clases, dtype_X, dtype_y, rutas):
+        """esquema json de los datos binarios (lo que lee cargar_datos_binarios)"""
+        return {
+            'version': 1,
+            'filas': int(filas),
+            'columnas': list(columnas),
+            'objetivo': 'riesgo',
+            'clases': [str(c) for c in clases],
+            'dtype_X': np.dtype(dtype_X).str,
+            'dtype_y': np.dtype(dtype_y).str,
+            # estadisticas de la limpieza: el modelo las guarda para limpiar igual al predecir
+            'limpieza': {k: v for k, v in (self.estadisticas_limpieza or {}).items() if k != 'perfil'} or None,
+            'archivos': {k: os.path.basename(v) for k, v in rutas.items() if k != 'esquema'}
+        }
+        
+    def anexar_datos_binarios(self, ruta_base, nuevos):
+        """
+        agrega solo las filas de nuevos (ya limpias) al final de los arreglos de
+        guardar_datos_binarios y actualiza el esquema; si no hay almacen o cambian
+        las columnas o las clases de riesgo se reescribe completo desde datos_limpios
+        """
+        try:
+            with open(f'{ruta_base}.json') as f:
+                esquema = json.load(f)
+        except (OSError, ValueError):
+            esquema = None
+            
+        clases = np.array(esquema['clases']) if esquema else np.array([])
+        riesgo = nuevos['riesgo'].astype(str).to_numpy() if 'riesgo' in nuevos.columns else None
+        compatible = (
+            esquema is not None and riesgo is not None
+            and [col for col in nuevos.columns if col != 'riesgo'] == esquema['columnas']
+            and np.isin(riesgo, clases).all()
+        )
+        
+        directorio = os.path.dirname(ruta_base)
+        rutas = {k: os.path.join(directorio, v) for k, v in esquema['archivos'].items()} if compatible else {}
+        if compatible and len(nuevos):
+            X = nuevos[esquema['columnas']].to_numpy(dtype=np.dtype(esquema['dtype_X']))
+            codigos = np.searchsorted(clases, riesgo).astype(np.dtype(esquema['dtype_y']))
+            # la matriz primero: si la etiqueta no cabe, se reescribe todo
+            compatible = (_anexar_npy(rutas['X'], X, esquema['filas'])
+                          and _anexar_npy(rutas['y'], codigos, esquema['filas']))
+            
+        if not compatible:
+            return self.guardar_datos_binarios(ruta_base)
+            
+        # el esquema se actualiza al final, como en guardar_datos_binarios
+        esquema['filas'] = int(esquema['filas'] + len(nuevos))
+        rutas['esquema'] = _escribir_esquema_binario(ruta_base, esquema)
+        
+        self.registros.append(f"{len(nuevos)} filas anexadas a {rutas['X']}")
+        return rutas
+        
     def obtener_estadisticas(self):
         """retorna estadisticas de los datos en español"""
         if self.datos_limpios is None:
@@ -233,4 +833,145 @@ class ProcesadorDatos:
             # convertir valores numpy a int de python
             estadisticas['distribucion_riesgo'] = {k: int(v) for k, v in distribucion.items()}
             
-        return estadisticas
\ No newline at end of file
+        return estadisticas
+
+
+def cargar_datos_binarios(ruta_base, mmap=True):
+    """
+    carga datos guardados con guardar_datos_binarios; con mmap=True la matriz
+    X se mapea en memoria (solo lectura) en lugar de leerse completa
+    """
+    with open(f'{ruta_base}.json') as f:
+        esquema = json.load(f)
+        
+    directorio = os.path.dirname(ruta_base)
+    X = np.load(os.path.join(directorio, esquema['archivos']['X']), mmap_mode='r' if mmap else None)
+    codigos = np.load(os.path.join(directorio, esquema['archivos']['y']))
+    
+    if X.shape != (esquema['filas'], len(esquema['columnas'])) or len(codigos) != esquema['filas']:
+        raise ValueError("datos binarios inconsistentes con su esquema")
+        
+    return {
+        'X': X,
+        'y': np.take(np.array(esquema['clases']), codigos),
+        'columnas': esquema['columnas'],
+        'esquema': esquema
+    }
+
+
+def hashes_filas(datos):
+    """
+    hash de 64 bits por fila en forma canonica: numeros como float64 exactos (igual
+    que compara drop_duplicates en limpiar_datos) y riesgo como texto. una columna
+    float32 (carga por bloques) se lleva a float64 por su texto decimal mas corto,
+    asi 85.3 leido en float32 da el mismo hash que 85.3 leido en float64
+    """
+    canonico = pd.DataFrame({
+        col: datos[col].astype(str) if col == 'riesgo' else _numeros_float64(datos[col])
+        for col in datos.columns
+    }, copy=False)
+    return pd.util.hash_pandas_object(canonico, index=False).to_numpy()
+
+
+def _numeros_float64(serie):
+    """
+    valores de una columna numerica como float64 (float32 via su texto decimal);
+    -0.0 pasa a 0.0 porque drop_duplicates los considera iguales
+    """
+    if serie.dtype == np.float32:
+        return serie.to_numpy().astype(str).astype(np.float64) + 0.0
+    return serie.to_numpy(dtype=np.float64) + 0.0
+
+
+def _leer_cabecera_npy(f):
+    """(version, forma, orden fortran, dtype, inicio de los datos) de un .npy abierto"""
+    formato = np.lib.format
+    version = formato.read_magic(f)
+    if version == (1, 0):
+        forma, fortran, dtype = formato.read_array_header_1_0(f)
+    elif version == (2, 0):
+        forma, fortran, dtype = formato.read_array_header_2_0(f)
+    else:
+        raise ValueError(f"version de .npy no soportada: {version}")
+    return version, forma, fortran, dtype, f.tell()
+
+
+def _cabecera_npy(version, inicio_datos, dtype, forma):
+    """
+    bytes de la cabecera de un .npy con otra forma que ocupan lo mismo que la
+    actual (inicio_datos; el texto se rellena con espacios, como hace numpy);
+    None si el texto nuevo no cabe
+    """
+    texto = repr({'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': False, 'shape': tuple(forma)})
+    prefijo = 10 if version == (1, 0) else 12
+    espacio = inicio_datos - prefijo
+    if len(texto) + 1 > espacio:
+        return None
+    longitud = struct.pack('<H' if version == (1, 0) else '<I', espacio)
+    return np.lib.format.magic(*version) + longitud + (texto.ljust(espacio - 1) + '\n').encode('latin1')
+
+
+def _anexar_npy(ruta, filas, filas_actuales):
+    """
+    agrega filas al final de un .npy en orden c sin reescribir lo existente: se
+    escriben los datos y luego la cabecera con la forma nueva. retorna False (sin
+    tocar el archivo) si la forma no coincide con filas_actuales, el tipo o las
+    columnas difieren, o la cabecera nueva no cabe en el espacio de la anterior
+    """
+    with open(ruta, 'r+b') as f:
+        version, forma, fortran, dtype, inicio_datos = _leer_cabecera_npy(f)
+        if fortran or dtype != filas.dtype or forma[0] != filas_actuales or forma[1:] != filas.shape[1:]:
+            return False
+        cabecera = _cabecera_npy(version, inicio_datos, dtype, (forma[0] + len(filas),) + forma[1:])
+        if cabecera is None:
+            return False
+            
+        f.seek(inicio_datos + forma[0] * int(np.prod(forma[1:], dtype=np.int64)) * dtype.itemsize)
+        f.write(np.ascontiguousarray(filas).tobytes())
+        f.truncate()
+        f.seek(0)
+        f.write(cabecera)
+    return True
+
+
+def _recortar_npy(ruta, n_filas):
+    """deja solo las primeras n_filas de un .npy en orden c (cabecera y tamaño del archivo)"""
+    with open(ruta, 'r+b') as f:
+        version, forma, _, dtype, inicio_datos = _leer_cabecera_npy(f)
+        forma = (int(n_filas),) + forma[1:]
+        cabecera = _cabecera_npy(version, inicio_datos, dtype, forma)
+        if cabecera is None:
+            raise ValueError(f"no se pudo actualizar la cabecera de {ruta}")
+        f.seek(0)
+        f.write(cabecera)
+        f.truncate(inicio_datos + int(np.prod(forma, dtype=np.int64)) * dtype.itemsize)
+
+
+def _escribir_esquema_binario(ruta_base, esquema):
+    """esquema de los datos binarios (temporal + reemplazo); se escribe al final"""
+    ruta = f'{ruta_base}.json'
+    with open(f'{ruta}.tmp', 'w') as f:
+        json.dump(esquema, f, indent=2)
+    os.replace(f'{ruta}.tmp', ruta)
+    return ruta
+
+
+def _guardar_indice_filas(directorio, hashes):
+    """guarda el indice ordenado de hashes (temporal + reemplazo)"""
+    ruta = os.path.join(directorio, ARCHIVO_INDICE_FILAS)
+    with open(f'{ruta}.tmp', 'wb') as f:
+        np.save(f, np.asarray(hashes, dtype=np.uint64))
+    os.replace(f'{ruta}.tmp', ruta)
+
+
+def cargar_estado_incremental(directorio):
+    """estadisticas congeladas y indice ordenado de hashes de la ultima limpieza completa"""
+    ruta = os.path.join(directorio, ARCHIVO_ESTADISTICAS)
+    if not os.path.exists(ruta):
+        raise ValueError("no hay estadisticas de limpieza, ejecuta una limpieza completa primero")
+    with open(ruta) as f:
+        estadisticas = json.load(f)
+        
+    ruta_indice = os.path.join(directorio, ARCHIVO_INDICE_FILAS)
+    indice = np.load(ruta_indice) if os.path.exists(ruta_indice) else np.empty(0, dtype=np.uint64)
+    return estadisticas, indice
@@ -0,0 +1,167 @@
+"""
+registro.py
+registro de versiones del modelo: cada entrenamiento guardado crea una version
+con sus hiperparametros, metricas y huella de datos; una de ellas esta promovida
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from .artefacto import guardar_artefacto, ruta_temporal
+from .servicio import ModeloServicio
+
+try:
+    import fcntl
+except ImportError:  # windows
+    fcntl = None
+    import msvcrt
+
+
+# subdirectorio de data/ con los artefactos versionados y su indice
+DIRECTORIO_REGISTRO = 'registro'
+
+# artefacto del modelo promovido (el que se carga al iniciar la aplicacion)
+ARCHIVO_MODELO = 'modelo_studentguard.sgm'
+
+# exportacion con el escalado plegado en los pesos (solo para servir predicciones)
+ARCHIVO_MODELO_PLEGADO = 'modelo_studentguard_plegado.sgm'
+
+
+@contextmanager
+def candado_archivo(ruta):
+    """
+    candado exclusivo entre procesos (por ejemplo, workers de gunicorn) sobre el
+    archivo ruta; flock en posix, msvcrt.locking en windows
+    """
+    directorio = os.path.dirname(ruta)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    with open(ruta, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class RegistroModelos:
+    """
+    versiones en <directorio>/v0001.sgm, v0002.sgm, ... y un indice.json con
+    sus metadatos; el indice se reescribe completo (temporal + reemplazo)
+
+    las escrituras toman un candado de hilos y otro entre procesos (indice.lock),
+    asi varios workers pueden registrar y promover sobre el mismo directorio
+    """
+
+    def __init__(self, directorio, max_en_memoria=8):
+        self.directorio = directorio
+        self.ruta_indice = os.path.join(directorio, 'indice.json')
+        self.ruta_candado = os.path.join(directorio, 'indice.lock')
+        self.max_en_memoria = max_en_memoria
+        self._candado = threading.Lock()
+        # instantaneas ya cargadas por version: promover una reciente no lee disco
+        self._servicios = OrderedDict()
+
+    def _leer_indice(self):
+        if not os.path.exists(self.ruta_indice):
+            return {'versiones': [], 'promovida': None}
+        with open(self.ruta_indice) as f:
+            return json.load(f)
+
+    def _escribir_indice(self, indice):
+        os.makedirs(self.directorio, exist_ok=True)
+        temporal = ruta_temporal(self.ruta_indice)
+        with open(temporal, 'w') as f:
+            json.dump(indice, f, indent=2)
+        os.replace(temporal, self.ruta_indice)
+
+    def _ruta_version(self, info):
+        return os.path.join(self.directorio, info['archivo'])
+
+    def registrar(self, arreglos, metadatos, descripcion):
+        """
+        guarda el artefacto como nueva version y la agrega al indice
+        descripcion: hiperparametros, metricas, huella_datos, ... (serializable a json)
+        """
+        with self._candado, candado_archivo(self.ruta_candado):
+            indice = self._leer_indice()
+            version = max((v['version'] for v in indice['versiones']), default=0) + 1
+            info = {
+                'version': version,
+                'archivo': f'v{version:04d}.sgm',
+                'creado': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                **descripcion
+            }
+            info['checksum'] = guardar_artefacto(self._ruta_version(info), arreglos, metadatos)
+            indice['versiones'].append(info)
+            self._escribir_indice(indice)
+        return info
+
+    def listar(self):
+        """versiones registradas (mas nueva primero) y la version promovida"""
+        with self._candado:
+            indice = self._leer_indice()
+        return {
+            'versiones': list(reversed(indice['versiones'])),
+            'promovida': indice['promovida']
+        }
+
+    def obtener(self, version):
+        """metadatos de una version"""
+        with self._candado:
+            indice = self._leer_indice()
+        for info in indice['versiones']:
+            if info['version'] == version:
+                return info
+        raise ValueError(f"version {version} no encontrada")
+
+    def servicio(self, version):
+        """instantanea de una version, cargada una sola vez y mantenida en memoria"""
+        with self._candado:
+            if version in self._servicios:
+                self._servicios.move_to_end(version)
+                return self._servicios[version]
+
+        info = self.obtener(version)
+        servicio = ModeloServicio.desde_archivo(self._ruta_version(info))
+
+        with self._candado:
+            self._servicios[version] = servicio
+            self._servicios.move_to_end(version)
+            while len(self._servicios) > self.max_en_memoria:
+                self._servicios.popitem(last=False)
+        return servicio
+
+    def promover(self, version, ruta_actual=None):
+        """
+        marca la version como promovida; si se indica ruta_actual, copia su
+        artefacto alli (el modelo que se carga al iniciar la aplicacion)
+        """
+        info = self.obtener(version)
+        with self._candado, candado_archivo(self.ruta_candado):
+            if ruta_actual:
+                temporal = ruta_temporal(ruta_actual)
+                shutil.copyfile(self._ruta_version(info), temporal)
+                os.replace(temporal, ruta_actual)
+
+            indice = self._leer_indice()
+            indice['promovida'] = version
+            self._escribir_indice(indice)
+        return info
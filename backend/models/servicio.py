@@ -0,0 +1,79 @@
+"""
+servicio.py
+modelo de servicio: instantanea inmutable usada por los endpoints de prediccion
+"""
+
+import numpy as np
+import hashlib
+import os
+from .clasificador_estudiante import ClasificadorEstudiante
+from .artefacto import cargar_artefacto
+from .transformador import TransformadorPreprocesamiento
+from .inferencia import ModeloInferencia
+
+
+class ModeloServicio:
+    """
+    instantanea de solo lectura de un modelo entrenado (pesos, clases, escalado
+    y preprocesamiento ajustado)
+
+    nunca se modifica despues de construirse: para cambiar de modelo se crea
+    una instantanea nueva y se reemplaza la referencia completa
+    """
+
+    def __init__(self, arreglos, metadatos):
+        # copias propias de solo lectura: el entrenamiento no puede alterarlas
+        arreglos = {nombre: self._solo_lectura(a) for nombre, a in arreglos.items()}
+
+        self.modelo = ClasificadorEstudiante()
+        self.modelo.from_artifact(arreglos, metadatos)
+        self.clases = [str(c) for c in self.modelo.classes]
+        self.scaler_mean = arreglos.get('scaler_mean')
+        self.scaler_std = arreglos.get('scaler_std')
+        # registros crudos: modelo plegado con ruta en python puro para una fila
+        self.inferencia = ModeloInferencia(arreglos, metadatos)
+        # limpieza y escalado del entrenamiento; modelos anteriores solo tienen el escalado
+        self.transformador = TransformadorPreprocesamiento.desde_dict(
+            metadatos.get('preprocesamiento'), self.scaler_mean, self.scaler_std
+        )
+        self.huella = self._calcular_huella()
+
+    @staticmethod
+    def _solo_lectura(arreglo):
+        """
+        copia del arreglo marcada como no escribible; a este tamaño copiar no cuesta
+        nada y la instantanea no deja mapeado (ni bloqueado en windows) el .sgm
+        """
+        copia = np.array(arreglo, copy=True)
+        copia.setflags(write=False)
+        return copia
+
+    @classmethod
+    def desde_archivo(cls, ruta, mmap=True):
+        """crea la instantanea desde un artefacto binario (.sgm)"""
+        if not os.path.exists(ruta):
+            raise ValueError("modelo no encontrado")
+        arreglos, metadatos, _ = cargar_artefacto(ruta, mmap=mmap)
+        return cls(arreglos, metadatos)
+
+    def _calcular_huella(self):
+        """misma huella que EntrenadorModelo.huella_modelo"""
+        h = hashlib.sha256()
+        h.update(np.ascontiguousarray(self.modelo.weights).tobytes())
+        h.update(np.ascontiguousarray(self.modelo.bias).tobytes())
+        h.update(repr(self.clases).encode())
+        if self.scaler_mean is not None:
+            h.update(np.ascontiguousarray(self.scaler_mean, dtype=np.float64).tobytes())
+            h.update(np.ascontiguousarray(self.scaler_std, dtype=np.float64).tobytes())
+        return h.hexdigest()
+
+    def predecir_registro(self, registro):
+        """predice riesgo para un registro crudo (dict) de un estudiante"""
+        return self.inferencia.predecir(registro)
+
+    def predecir_registros(self, registros):
+        """
+        predice riesgo para registros crudos (dict, lista de dicts o dataframe):
+        se limpian con las estadisticas del entrenamiento antes de escalar
+        """
+        return self.inferencia.predecir_registros(registros)
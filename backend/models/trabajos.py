@@ -0,0 +1,169 @@
+"""
+trabajos.py
+trabajos de entrenamiento en segundo plano con progreso consultable
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TrabajoEntrenamiento:
+    """
+    estado de un trabajo en segundo plano: fase actual, tiempos por fase,
+    costo por iteracion y resultado final; se actualiza desde el hilo trabajador
+    y se lee desde las peticiones, siempre bajo el candado
+    """
+
+    ESTADOS = ('en_cola', 'ejecutando', 'completado', 'error')
+
+    def __init__(self, parametros=None):
+        self.id = uuid.uuid4().hex
+        self.parametros = parametros or {}
+        self.estado = 'en_cola'
+        self.fase = None
+        self.tiempos_fases = {}
+        self.costos = []
+        self.registros = []
+        self.resultado = None
+        self.error = None
+        self.creado = time.time()
+        self.iniciado = None
+        self.terminado = None
+        self._inicio_fase = None
+        self._candado = threading.Lock()
+        self._fin = threading.Event()
+
+    def _cerrar_fase(self, ahora):
+        """acumula el tiempo de la fase en curso (llamar con el candado tomado)"""
+        if self.fase is not None:
+            self.tiempos_fases[self.fase] = round(ahora - self._inicio_fase, 4)
+
+    def iniciar(self):
+        with self._candado:
+            self.estado = 'ejecutando'
+            self.iniciado = time.time()
+
+    def iniciar_fase(self, fase, mensaje=None):
+        """cambia de fase y registra el tiempo de la anterior"""
+        ahora = time.perf_counter()
+        with self._candado:
+            self._cerrar_fase(ahora)
+            self.fase = fase
+            self._inicio_fase = ahora
+            if mensaje:
+                self.registros.append(mensaje)
+
+    def registrar(self, mensaje):
+        with self._candado:
+            self.registros.append(mensaje)
+
+    def registrar_costo(self, iteracion, costo):
+        """callback de ClasificadorEstudiante.fit"""
+        with self._candado:
+            self.costos.append(costo)
+
+    def completar(self, resultado):
+        with self._candado:
+            self._cerrar_fase(time.perf_counter())
+            self.fase = None
+            self.resultado = resultado
+            self.estado = 'completado'
+            self.terminado = time.time()
+        self._fin.set()
+
+    def fallar(self, error):
+        with self._candado:
+            self._cerrar_fase(time.perf_counter())
+            self.error = str(error)
+            self.estado = 'error'
+            self.terminado = time.time()
+        self._fin.set()
+
+    @property
+    def finalizado(self):
+        return self._fin.is_set()
+
+    def esperar(self, timeout=None):
+        """bloquea hasta que el trabajo termine; retorna False si vence el timeout"""
+        return self._fin.wait(timeout)
+
+    def a_dict(self, desde=0):
+        """
+        vista serializable del trabajo; 'desde' permite pedir solo los costos
+        nuevos desde la ultima consulta (costos[desde:])
+        """
+        with self._candado:
+            desde = max(0, min(int(desde), len(self.costos)))
+            fases = dict(self.tiempos_fases)
+            if self.fase is not None:
+                fases[self.fase] = round(time.perf_counter() - self._inicio_fase, 4)
+            referencia = self.terminado or time.time()
+            return {
+                'id': self.id,
+                'estado': self.estado,
+                'fase': self.fase,
+                'parametros': self.parametros,
+                'iteraciones': len(self.costos),
+                'costo_actual': self.costos[-1] if self.costos else None,
+                'costos_desde': desde,
+                'costos': self.costos[desde:],
+                'tiempos_fases': fases,
+                'duracion': round(referencia - self.iniciado, 4) if self.iniciado else None,
+                'logs': list(self.registros),
+                'resultado': self.resultado,
+                'error': self.error
+            }
+
+
+class GestorTrabajos:
+    """pool de trabajadores y registro de trabajos recientes"""
+
+    def __init__(self, max_trabajadores=1, max_historial=50):
+        self._pool = ThreadPoolExecutor(max_workers=max_trabajadores,
+                                        thread_name_prefix='entrenamiento')
+        self._trabajos = OrderedDict()
+        self._candado = threading.Lock()
+        self.max_historial = max_historial
+
+    def enviar(self, funcion, parametros=None):
+        """
+        encola funcion(trabajo) y retorna el trabajo de inmediato; el valor que
+        retorne la funcion es el resultado, una excepcion marca el trabajo con error
+        """
+        trabajo = TrabajoEntrenamiento(parametros)
+        with self._candado:
+            self._trabajos[trabajo.id] = trabajo
+            self._podar()
+
+        def ejecutar():
+            trabajo.iniciar()
+            try:
+                trabajo.completar(funcion(trabajo))
+            except Exception as e:
+                trabajo.fallar(e)
+
+        self._pool.submit(ejecutar)
+        return trabajo
+
+    def _podar(self):
+        """descarta los trabajos terminados mas antiguos (llamar con el candado tomado)"""
+        exceso = len(self._trabajos) - self.max_historial
+        for id_trabajo in list(self._trabajos):
+            if exceso <= 0:
+                break
+            if self._trabajos[id_trabajo].finalizado:
+                del self._trabajos[id_trabajo]
+                exceso -= 1
+
+    def obtener(self, id_trabajo):
+        with self._candado:
+            return self._trabajos.get(id_trabajo)
+
+    def listar(self):
+        with self._candado:
+            trabajos = list(self._trabajos.values())
+        return [{'id': t.id, 'estado': t.estado, 'fase': t.fase, 'creado': t.creado}
+                for t in reversed(trabajos)]
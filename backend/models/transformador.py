@@ -0,0 +1,166 @@
+"""
+transformador.py
+preprocesamiento ajustado y serializable compartido por entrenamiento y prediccion
+"""
+
+import numpy as np
+
+
+# caracteristicas por defecto (modelos guardados antes de existir el transformador)
+COLUMNAS_CARACTERISTICAS = [
+    'promedio_actual', 'asistencia_clases', 'tareas_entregadas', 'participacion_clase',
+    'horas_estudio', 'promedio_evaluaciones', 'cursos_reprobados',
+    'actividades_extracurriculares', 'reportes_disciplinarios'
+]
+
+PREFIJO_ACTIVIDAD = 'actividad_'
+
+
+class TransformadorPreprocesamiento:
+    """
+    todas las estadisticas aprendidas del preprocesamiento en un solo objeto:
+    medianas de imputacion, limites iqr de horas_estudio, forma de interpretar las
+    actividades (conteo o indicadores) y media/desviacion de la estandarizacion
+
+    transformar() aplica todo sobre un lote de registros crudos en una pasada
+    vectorizada; escalar() aplica solo la estandarizacion a valores ya limpios
+    """
+
+    def __init__(self, columnas=None, medianas=None, limites_horas_estudio=None,
+                 modo_actividades='conteo', mean=None, std=None):
+        self.columnas = list(columnas) if columnas is not None else list(COLUMNAS_CARACTERISTICAS)
+        self.medianas = {col: v for col, v in (medianas or {}).items() if v is not None}
+        self.limites_horas_estudio = list(limites_horas_estudio) if limites_horas_estudio is not None else None
+        self.modo_actividades = modo_actividades
+        self.mean = None if mean is None else np.asarray(mean, dtype=np.float64)
+        self.std = None if std is None else np.asarray(std, dtype=np.float64)
+
+    @classmethod
+    def desde_estadisticas(cls, estadisticas, columnas, mean=None, std=None):
+        """transformador a partir de ProcesadorDatos.estadisticas_limpieza y el escalado"""
+        estadisticas = estadisticas or {}
+        return cls(
+            columnas=columnas,
+            medianas=estadisticas.get('medianas'),
+            limites_horas_estudio=estadisticas.get('limites_horas_estudio'),
+            modo_actividades=estadisticas.get('modo_actividades', 'conteo'),
+            mean=mean,
+            std=std
+        )
+
+    def a_dict(self):
+        """parametros serializables a json (media y desviacion van como arreglos aparte)"""
+        return {
+            'columnas': self.columnas,
+            'medianas': self.medianas,
+            'limites_horas_estudio': self.limites_horas_estudio,
+            'modo_actividades': self.modo_actividades
+        }
+
+    @classmethod
+    def desde_dict(cls, parametros, mean=None, std=None):
+        return cls(**(parametros or {}), mean=mean, std=std)
+
+    @property
+    def columnas_entrada(self):
+        """columnas que deben tener los registros crudos"""
+        columnas = [col for col in self.columnas if not col.startswith(PREFIJO_ACTIVIDAD)]
+        if self.modo_actividades == 'indicadores' and 'actividades_extracurriculares' not in columnas:
+            columnas.append('actividades_extracurriculares')
+        return columnas
+
+    def escalar(self, X):
+        """estandarizacion con la media y desviacion del entrenamiento"""
+        if self.mean is None:
+            return X
+        return (X - self.mean) / self.std
+
+    def plegar(self, weights, bias):
+        """
+        pliega la estandarizacion en los pesos del modelo: ((x - mean) / std) W + b
+        equivale a x W' + b' con W' = W / std[:, None] y b' = b - (mean / std) W
+        retorna (W', b', transformador sin escalado con la misma limpieza)
+        """
+        weights = np.asarray(weights, dtype=np.float64)
+        bias = np.asarray(bias, dtype=np.float64)
+        if self.mean is None:
+            return weights, bias, self
+
+        pesos_plegados = weights / self.std[:, None]
+        bias_plegado = bias - np.dot(self.mean / self.std, weights)
+        # sin escalado ya no hay media para imputar: se fija como mediana donde falte
+        medianas = {col: self.medianas.get(col, float(media)) for col, media in zip(self.columnas, self.mean)}
+        sin_escalado = TransformadorPreprocesamiento(
+            self.columnas, medianas, self.limites_horas_estudio, self.modo_actividades
+        )
+        return pesos_plegados, bias_plegado, sin_escalado
+
+    def limpiar(self, registros):
+        """
+        registros crudos (dataframe, lista de dicts o dict) -> matriz float64 limpia
+        en el orden de self.columnas, con los mismos pasos que ProcesadorDatos:
+        conversion numerica y rangos 0-100, actividades, imputacion y recorte iqr
+        """
+        # pandas y el procesador solo se necesitan para registros crudos
+        import pandas as pd
+        from .procesador_datos import ProcesadorDatos
+
+        if isinstance(registros, dict):
+            registros = [registros]
+        if not isinstance(registros, pd.DataFrame):
+            registros = pd.DataFrame(registros)
+
+        faltantes = [col for col in self.columnas_entrada if col not in registros.columns]
+        if faltantes:
+            raise ValueError(f'faltan columnas {faltantes}')
+
+        procesador = ProcesadorDatos()
+        datos = pd.DataFrame({col: registros[col] for col in self.columnas_entrada}, copy=False)
+        datos = procesador._limpiar_numericas(datos)
+        datos = procesador._limpiar_participacion(datos)
+        datos = self._limpiar_actividades(procesador, datos)
+
+        # imputacion con las medianas del entrenamiento; sin mediana (modelos
+        # anteriores) se usa la media del escalado, que equivale a un valor neutro
+        for i, col in enumerate(self.columnas):
+            if datos[col].isna().any():
+                if col in self.medianas:
+                    relleno = self.medianas[col]
+                elif self.mean is not None:
+                    relleno = float(self.mean[i])
+                else:
+                    raise ValueError(f'valores faltantes en {col} sin estadistica de imputacion')
+                datos[col] = datos[col].fillna(relleno)
+
+        if self.limites_horas_estudio is not None and 'horas_estudio' in datos.columns:
+            datos['horas_estudio'] = datos['horas_estudio'].clip(*self.limites_horas_estudio)
+
+        return datos[self.columnas].to_numpy(dtype=np.float64)
+
+    def _limpiar_actividades(self, procesador, datos):
+        """actividades como en la limpieza; en modo conteo un numero ya es el conteo"""
+        import pandas as pd
+
+        actividades = datos['actividades_extracurriculares']
+        if self.modo_actividades == 'indicadores':
+            indicadores = procesador._limpiar_actividades(
+                pd.DataFrame({'actividades_extracurriculares': actividades}), 'indicadores'
+            )
+            # actividades desconocidas se ignoran; las del entrenamiento que falten valen 0
+            columnas_actividad = [col for col in self.columnas if col.startswith(PREFIJO_ACTIVIDAD)]
+            indicadores = indicadores.reindex(columns=columnas_actividad, fill_value=0)
+            return pd.concat([datos.drop(columns='actividades_extracurriculares'), indicadores], axis=1)
+
+        conteo = pd.to_numeric(actividades, errors='coerce')
+        texto = conteo.isna()
+        if texto.any():
+            analizadas = procesador._limpiar_actividades(
+                pd.DataFrame({'actividades_extracurriculares': actividades[texto]}), 'conteo'
+            )
+            conteo[texto] = analizadas['actividades_extracurriculares']
+        datos['actividades_extracurriculares'] = conteo.astype(np.float64)
+        return datos
+
+    def transformar(self, registros):
+        """registros crudos -> matriz lista para el modelo (limpia y estandarizada)"""
+        return self.escalar(self.limpiar(registros))
@@ -0,0 +1,6 @@
+"""configuracion de pytest: los modulos se importan como en app.py (models.*)"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from models import busqueda
+from models.busqueda import busqueda_halving, generar_candidatos
+
+
+def test_generar_candidatos_rechaza_rangos_invalidos():
+    with pytest.raises(ValueError, match='learning_rate'):
+        generar_candidatos({'learning_rate': [0.1, -0.1]})
+    with pytest.raises(ValueError, match='batch_size'):
+        generar_candidatos({'solver': ['sgd'], 'batch_size': [0]})
+    with pytest.raises(ValueError, match='max_iterations'):
+        generar_candidatos({'max_iterations': {'min': 10, 'max': 50}}, modo='aleatoria', n_candidatos=3)
+
+
+@pytest.mark.parametrize('n_candidatos, rondas_esperadas', [(2, 1), (3, 1), (9, 2), (10, 3), (27, 3)])
+def test_halving_termina_con_un_candidato(monkeypatch, n_candidatos, rondas_esperadas):
+    # puntajes fijos por configuracion: no hace falta entrenar
+    def puntuar(self, lista_params, X, y, cv=5, n_jobs=None, backend='thread', n_filas=None, inicial=None):
+        return [[p['learning_rate']] * cv for p in lista_params]
+
+    monkeypatch.setattr(busqueda.EvaluadorModelo, 'cross_validation_scores', puntuar)
+    candidatos = [{'learning_rate': 0.01 * (i + 1)} for i in range(n_candidatos)]
+    X, y = np.zeros((100000, 2)), np.zeros(100000)
+
+    resultado = busqueda_halving(X, y, candidatos, cv=2, factor=3)
+
+    assert len(resultado['rondas']) == rondas_esperadas
+    assert resultado['rondas'][-1]['candidatos'] > 1
+    assert resultado['rondas'][-1]['muestras'] == len(X)
+    assert resultado['mejor']['parametros'] == candidatos[-1]
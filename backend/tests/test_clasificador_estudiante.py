@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from models.clasificador_estudiante import ClasificadorEstudiante
+
+
+def _datos(n=600, n_features=4, semilla=0):
+    rng = np.random.RandomState(semilla)
+    X = rng.normal(size=(n, n_features))
+    y = np.array(['alto', 'bajo', 'medio'])[np.argmax(X[:, :3], axis=1)]
+    return X, y
+
+
+@pytest.mark.parametrize('solver', ['gd', 'lbfgs', 'newton'])
+@pytest.mark.parametrize('early_stopping', [False, True])
+def test_fit_con_indices_equivale_a_filas_copiadas(solver, early_stopping):
+    # indices de un fold: dos tramos consecutivos (vistas) mas filas sueltas
+    X, y = _datos()
+    indices = np.concatenate([np.arange(0, 300), np.arange(310, 600, 3), np.arange(400, 420)])
+    parametros = dict(solver=solver, max_iterations=40, early_stopping=early_stopping)
+
+    con_indices = ClasificadorEstudiante(**parametros)
+    con_indices.fit(X, y, indices=indices)
+    copiado = ClasificadorEstudiante(**parametros)
+    copiado.fit(X[indices], y[indices])
+
+    np.testing.assert_allclose(con_indices.weights, copiado.weights, rtol=1e-6, atol=1e-9)
+    np.testing.assert_allclose(con_indices.bias, copiado.bias, rtol=1e-6, atol=1e-9)
+
+
+@pytest.mark.parametrize('parametros', [
+    {'learning_rate': 0},
+    {'learning_rate': -0.1},
+    {'max_iterations': 0},
+    {'max_iterations': 10.5},
+    {'regularization': -1},
+    {'batch_size': 0},
+    {'momentum': 1.0},
+    {'tol': -1e-3},
+    {'n_iter_no_change': 0},
+    {'validation_fraction': 1.0},
+    {'early_stopping': 'si'},
+    {'warm_start': 1},
+])
+def test_hiperparametros_invalidos(parametros):
+    with pytest.raises(ValueError, match=next(iter(parametros))):
+        ClasificadorEstudiante(**parametros)
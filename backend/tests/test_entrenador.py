@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+from models.entrenador import EntrenadorModelo
+
+
+def _datos(n_features, n=120, semilla=0):
+    rng = np.random.RandomState(semilla)
+    datos = pd.DataFrame(rng.normal(10, 3, size=(n, n_features)),
+                         columns=[f'caracteristica_{i}' for i in range(n_features)])
+    datos['riesgo'] = np.where(datos['caracteristica_0'] > 10, 'alto', 'bajo')
+    return datos
+
+
+def _entrenado(datos, **opciones):
+    entrenador = EntrenadorModelo()
+    entrenador.preparar_datos(datos)
+    entrenador.entrenar(max_iterations=30, **opciones)
+    return entrenador
+
+
+def test_warm_start_con_otras_caracteristicas_inicia_desde_cero():
+    # p.ej. el modelo servido usa el conteo de actividades y los datos nuevos indicadores
+    inicial = _entrenado(_datos(9)).instantanea()
+
+    entrenador = EntrenadorModelo()
+    entrenador.preparar_datos(_datos(12, semilla=1))
+    assert entrenador._pesos_reescalados(inicial) is None
+
+    info = entrenador.entrenar(max_iterations=30, warm_start=True, inicial=inicial)
+    assert info['caracteristicas'] == 12
+
+
+def test_warm_start_con_otras_clases_inicia_desde_cero():
+    servido = _entrenado(_datos(9)).instantanea()
+    datos = _datos(9, semilla=1)
+    datos['riesgo'] = np.where(datos['caracteristica_0'] > 10, 'alto', 'medio')
+
+    entrenador = EntrenadorModelo()
+    entrenador.preparar_datos(datos)
+    assert entrenador._pesos_reescalados(servido) is None
+    entrenador.entrenar(max_iterations=30, warm_start=True, inicial=servido)
+    assert [str(c) for c in entrenador.modelo.classes] == ['alto', 'medio']
+
+
+def test_warm_start_compatible_parte_del_modelo_servido():
+    servido = _entrenado(_datos(9)).instantanea()
+
+    # otro escalado: los pesos se re-expresan y el punto de partida predice igual
+    entrenador = EntrenadorModelo()
+    entrenador.preparar_datos(_datos(9, semilla=1))
+    weights, bias = entrenador._pesos_reescalados(servido)
+    entrenador.entrenar(max_iterations=30, warm_start=True, inicial=servido)
+    entrenador.modelo.weights, entrenador.modelo.bias = weights, bias
+
+    X = _datos(9, n=20, semilla=2).drop(columns='riesgo').to_numpy()
+    np.testing.assert_allclose(entrenador.instantanea().inferencia.predecir_lote(X)['probabilidades'],
+                               servido.inferencia.predecir_lote(X)['probabilidades'], atol=1e-6)
+
+
+def test_instantanea_desde_archivo_no_deja_el_artefacto_mapeado(tmp_path):
+    from models.servicio import ModeloServicio
+
+    _entrenado(_datos(9)).guardar_modelo(str(tmp_path))
+    servicio = ModeloServicio.desde_archivo(str(tmp_path / 'modelo_studentguard.sgm'))
+    for arreglo in (servicio.modelo.weights, servicio.modelo.bias, servicio.scaler_mean, servicio.scaler_std):
+        assert not isinstance(arreglo, np.memmap) and arreglo.base is None
+        assert not arreglo.flags.writeable
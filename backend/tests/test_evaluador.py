@@ -0,0 +1,55 @@
+"""
+pruebas de EvaluadorModelo con clases desbalanceadas y valores calculados a mano
+
+y_true: a x6, b x2, c x2
+  clase a: tp=4 fp=1 fn=2 -> precision 4/5, recall 4/6, f1 8/11
+  clase b: tp=1 fp=1 fn=1 -> precision 1/2, recall 1/2, f1 1/2
+  clase c: tp=2 fp=1 fn=0 -> precision 2/3, recall 1,   f1 4/5
+"""
+
+import pytest
+from models.evaluador import EvaluadorModelo
+
+
+Y_TRUE = ['a', 'a', 'a', 'a', 'a', 'a', 'b', 'b', 'c', 'c']
+Y_PRED = ['a', 'a', 'a', 'a', 'b', 'c', 'b', 'a', 'c', 'c']
+
+F1_CLASES = [8 / 11, 1 / 2, 4 / 5]
+
+
+@pytest.fixture
+def evaluador():
+    evaluador = EvaluadorModelo()
+    evaluador.set_predictions(Y_TRUE, Y_PRED)
+    return evaluador
+
+
+def test_f1_por_clase(evaluador):
+    assert evaluador.f1_por_clase() == pytest.approx(F1_CLASES)
+
+
+def test_f1_macro_promedia_f1_por_clase(evaluador):
+    assert evaluador.f1_score('macro') == pytest.approx(sum(F1_CLASES) / 3)
+
+
+def test_f1_weighted_pondera_por_soporte(evaluador):
+    esperado = (6 * F1_CLASES[0] + 2 * F1_CLASES[1] + 2 * F1_CLASES[2]) / 10
+    assert evaluador.f1_score('weighted') == pytest.approx(esperado)
+
+
+def test_f1_micro(evaluador):
+    # tp=7, fp=3, fn=3 -> precision = recall = 0.7
+    assert evaluador.f1_score('micro') == pytest.approx(0.7)
+
+
+def test_f1_no_es_media_armonica_de_promedios(evaluador):
+    precision, recall = evaluador.precision('macro'), evaluador.recall('macro')
+    armonica = 2 * precision * recall / (precision + recall)
+    assert evaluador.f1_score('macro') != pytest.approx(armonica)
+
+
+def test_reporte_y_resumen_usan_el_mismo_f1(evaluador):
+    reporte = evaluador.classification_report()
+    assert reporte['f1_score_weighted'] == pytest.approx(evaluador.f1_score('weighted'))
+    assert reporte['per_class']['a']['f1_score'] == pytest.approx(8 / 11)
+    assert evaluador.obtener_resumen_metricas()['f1_score'] == round(evaluador.f1_score('weighted') * 100, 2)
@@ -0,0 +1,142 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from models.procesador_datos import ProcesadorDatos, cargar_datos_binarios
+
+
+def _csv_crudo(n=60, semilla=0):
+    """lote crudo con decimales que no son exactos en float32"""
+    rng = np.random.RandomState(semilla)
+    actividades = ["['deportes']", "['club_lectura', 'teatro']", '[]']
+    datos = pd.DataFrame({
+        'promedio_actual': np.round(rng.uniform(40, 100, n), 4),
+        'asistencia_clases': np.round(rng.uniform(50, 100, n), 1),
+        'tareas_entregadas': rng.randint(5, 20, n),
+        'participacion_clase': np.round(rng.uniform(0, 100, n), 2),
+        'horas_estudio': np.round(rng.uniform(1, 25, n), 3),
+        'promedio_evaluaciones': np.round(rng.uniform(40, 100, n), 2),
+        'cursos_reprobados': rng.randint(0, 3, n),
+        'actividades_extracurriculares': [actividades[i % 3] for i in range(n)],
+        'reportes_disciplinarios': rng.randint(0, 2, n),
+        'riesgo': np.where(rng.uniform(size=n) < 0.4, 'riesgo', 'no riesgo'),
+    })
+    return datos.to_csv(index=False)
+
+
+@pytest.fixture
+def limpieza_por_streaming(tmp_path):
+    """como /upload-csv?streaming=1 seguido de /datos/limpieza"""
+    texto = _csv_crudo()
+    procesador = ProcesadorDatos()
+    procesador.cargar_csv_por_bloques(io.StringIO(texto), tamano_bloque=16)
+    procesador.limpiar_datos()
+    procesador.guardar_datos_limpios(str(tmp_path / 'datos_limpios.csv'))
+    procesador.guardar_datos_binarios(str(tmp_path / 'datos_limpios'))
+    procesador.guardar_estado_incremental(str(tmp_path))
+    return procesador, texto
+
+
+def test_reanexar_filas_tras_carga_por_streaming(tmp_path, limpieza_por_streaming):
+    procesador, texto = limpieza_por_streaming
+    filas_antes = len(procesador.datos_limpios)
+
+    # las mismas filas llegan por /datos/anexar (lectura float64 de pandas)
+    repetidas = pd.read_csv(io.StringIO(texto)).iloc[:25]
+    informe = procesador.anexar_datos(repetidas, str(tmp_path), str(tmp_path / 'datos_limpios.csv'),
+                                      umbral_drift=np.inf)
+
+    assert informe['filas_nuevas'] == 0
+    assert informe['duplicados'] == 25
+    assert len(pd.read_csv(tmp_path / 'datos_limpios.csv')) == filas_antes
+
+
+def test_anexar_agrega_solo_filas_nuevas_al_almacen_binario(tmp_path, limpieza_por_streaming):
+    procesador, texto = limpieza_por_streaming
+    ruta_base = str(tmp_path / 'datos_limpios')
+    antes = cargar_datos_binarios(ruta_base, mmap=False)
+
+    nuevos = pd.read_csv(io.StringIO(_csv_crudo(n=10, semilla=1)))
+    informe = procesador.anexar_datos(nuevos, str(tmp_path), str(tmp_path / 'datos_limpios.csv'),
+                                      umbral_drift=np.inf, ruta_binarios=ruta_base)
+    despues = cargar_datos_binarios(ruta_base, mmap=False)
+
+    n_antes = len(antes['X'])
+    assert len(despues['X']) == n_antes + informe['filas_nuevas'] == len(procesador.datos_limpios)
+    np.testing.assert_array_equal(despues['X'][:n_antes], antes['X'])
+    np.testing.assert_array_equal(despues['y'], procesador.datos_limpios['riesgo'].astype(str).to_numpy())
+    np.testing.assert_allclose(despues['X'][n_antes:],
+                               procesador.datos_limpios[despues['columnas']].to_numpy()[n_antes:])
+    assert any('filas anexadas a' in r and r.endswith('_X.npy') for r in procesador.registros)
+
+
+def test_limpieza_por_bloques_escribe_datos_binarios_sin_duplicados(tmp_path):
+    crudo = pd.read_csv(io.StringIO(_csv_crudo(n=50)))
+    # filas repetidas dentro de un bloque y entre bloques
+    crudo = pd.concat([crudo, crudo.iloc[[3, 3, 40, 7]]], ignore_index=True)
+    ruta_crudo = tmp_path / 'crudo.csv'
+    crudo.to_csv(ruta_crudo, index=False)
+
+    procesador = ProcesadorDatos()
+    resumen = procesador.limpiar_csv_por_bloques(str(ruta_crudo), str(tmp_path / 'limpios.csv'), tamano_bloque=16,
+                                                 ruta_binarios=str(tmp_path / 'limpios'))
+    binarios = cargar_datos_binarios(str(tmp_path / 'limpios'), mmap=False)
+    limpios = pd.read_csv(tmp_path / 'limpios.csv')
+
+    assert resumen['filas_leidas'] == 54
+    assert resumen['filas_escritas'] == len(limpios) == len(binarios['X']) == 50
+    assert binarios['esquema']['filas'] == 50
+    np.testing.assert_allclose(binarios['X'], limpios[binarios['columnas']].to_numpy())
+    np.testing.assert_array_equal(binarios['y'], limpios['riesgo'].astype(str).to_numpy())
+    # los .npy se recortan a las filas escritas (no quedan las reservadas de la pasada 1)
+    for nombre, arreglo in (('limpios_X.npy', binarios['X']), ('limpios_y.npy', np.load(tmp_path / 'limpios_y.npy'))):
+        with open(tmp_path / nombre, 'rb') as f:
+            np.lib.format.read_magic(f)
+            np.lib.format.read_array_header_1_0(f)
+            assert (tmp_path / nombre).stat().st_size == f.tell() + arreglo.nbytes
+
+
+def _casi_duplicadas(texto):
+    """6 filas distintas: 3 de un lote crudo y las mismas con promedio_actual + 1e-6"""
+    base = pd.read_csv(io.StringIO(texto)).iloc[:3]
+    cercanas = base.assign(promedio_actual=base['promedio_actual'] + 1e-6)
+    return base, cercanas
+
+
+def test_anexar_conserva_filas_casi_duplicadas_como_limpiar_datos(tmp_path):
+    base, cercanas = _casi_duplicadas(_csv_crudo(n=3))
+
+    en_memoria = ProcesadorDatos()
+    en_memoria.cargar_datos(pd.concat([base, cercanas, base], ignore_index=True))
+    assert len(en_memoria.limpiar_datos()) == 6
+
+    procesador = ProcesadorDatos()
+    procesador.cargar_datos(base)
+    procesador.limpiar_datos()
+    procesador.guardar_datos_limpios(str(tmp_path / 'datos_limpios.csv'))
+    procesador.guardar_estado_incremental(str(tmp_path))
+    informe = procesador.anexar_datos(pd.concat([cercanas, base], ignore_index=True), str(tmp_path),
+                                      str(tmp_path / 'datos_limpios.csv'), umbral_drift=np.inf)
+
+    assert informe['filas_nuevas'] == 3
+    assert informe['duplicados'] == 3
+    assert len(procesador.datos_limpios) == 6
+
+
+def test_limpieza_por_bloques_coincide_con_limpiar_datos_en_filas_casi_duplicadas(tmp_path):
+    crudo = pd.read_csv(io.StringIO(_csv_crudo(n=40)))
+    base, cercanas = _casi_duplicadas(_csv_crudo(n=40))
+    # casi duplicadas y duplicadas exactas, dentro de un bloque y entre bloques
+    crudo = pd.concat([crudo, cercanas, crudo.iloc[[3, 30]], base], ignore_index=True)
+    ruta_crudo = tmp_path / 'crudo.csv'
+    crudo.to_csv(ruta_crudo, index=False)
+
+    en_memoria = ProcesadorDatos()
+    en_memoria.cargar_datos(crudo)
+    esperado = en_memoria.limpiar_datos().reset_index(drop=True)
+    ProcesadorDatos().limpiar_csv_por_bloques(str(ruta_crudo), str(tmp_path / 'limpios.csv'), tamano_bloque=16)
+
+    assert len(esperado) == 43
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / 'limpios.csv'), esperado, check_dtype=False)